@@ -92,7 +92,7 @@ def main():
     logger.info("\n  Test 2: Tyre Recommendations")
     # Get first tyre size from database
     if processor.tyre_database:
-        test_size = list(processor.tyre_database.keys())[0]
+        test_size = next(iter(processor.tyre_database))
         tyres = processor.get_tyres_by_size(test_size, budget='mid')
         logger.success(f"    ✅ Found {len(tyres)} tyres for size {test_size}")
         for i, tyre in enumerate(tyres[:3], 1):
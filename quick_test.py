@@ -35,7 +35,7 @@ def test_ml_models():
     try:
         from src.ml_system.ml_inference import MLInferenceEngine
         engine = MLInferenceEngine()
-        logger.success(f"✅ ML Models loaded: {list(engine.models.keys())}")
+        logger.success(f"✅ ML Models available: {engine.available_models}")
         return True
     except Exception as e:
         logger.error(f"❌ ML Models failed: {e}")
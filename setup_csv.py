@@ -5,6 +5,7 @@ Runs all necessary steps automatically
 
 import sys
 import subprocess
+from importlib.util import find_spec
 from pathlib import Path
 from loguru import logger
 
@@ -46,11 +47,11 @@ def check_dependencies():
     required = ['pandas', 'numpy', 'loguru', 'joblib']
     missing = []
     
+    # Locate each package without importing it
     for package in required:
-        try:
-            __import__(package)
+        if find_spec(package) is not None:
             logger.success(f"✅ {package}")
-        except ImportError:
+        else:
             logger.warning(f"⚠️  {package} not found")
             missing.append(package)
     
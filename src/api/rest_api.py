@@ -8,10 +8,13 @@ from pathlib import Path
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider, JSONProvider
 from flask_cors import CORS
+import orjson
 from src.customer_service_agent.integrated_agent import IntegratedTyrePlexAgent
 from src.inhouse_ml.mongodb_manager import MongoDBManager
 from loguru import logger
@@ -21,8 +24,23 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+class ORJSONProvider(JSONProvider):
+    """Serialize responses with orjson; types it lacks fall back to Flask's defaults."""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(
+            obj,
+            default=DefaultJSONProvider.default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
 # Initialize agent
@@ -3,33 +3,63 @@ CSV-based tools for TyrePlex Voice Agent
 Uses your actual vehicle_tyre_mapping.csv data
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, Mapping, Optional, Tuple
 import sys
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+
+import numpy as np
 
 # Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent.parent))
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
 from src.inhouse_ml.csv_processor import CSVProcessor
+from src.utils.caching import cached_results
 from loguru import logger
 
 
+# Lookups whose results depend only on their arguments and the loaded CSV data
+CACHED_TOOLS = ('search_vehicles',)
+LOOKUP_CACHE_SIZE = 256
+# Tyre sizes (and size/budget pairs) kept indexed, least recently used evicted
+SIZE_INDEX_SIZE = 128
+
+
 class CSVTyrePlexTools:
     """
     Tools for TyrePlex voice agent using your CSV data.
     Provides instant lookups without LLM calls.
     """
     
-    def __init__(self, csv_path: str = 'vehicle_tyre_mapping.csv'):
+    def __init__(
+        self,
+        csv_path: str = 'vehicle_tyre_mapping.csv',
+        processor: Optional[CSVProcessor] = None,
+        cache_size: int = LOOKUP_CACHE_SIZE
+    ):
         """
         Initialize with CSV data.
         
         Args:
             csv_path: Path to your CSV file
+            processor: Already loaded CSVProcessor to share (skips loading)
+            cache_size: Max entries per memoized lookup (0 disables caching)
         """
         self.csv_path = csv_path
-        self.processor = None
-        self._load_or_process()
+        self.processor = processor
+        self._brands = None  # Sorted brand tuple, built on first request
+        # Per-size indexes, shared by every lookup, so they hold read-only records
+        self._sorted_tyres = lru_cache(maxsize=SIZE_INDEX_SIZE)(self._sorted_tyres)
+        self._tyres_for_budget = lru_cache(maxsize=SIZE_INDEX_SIZE)(self._tyres_for_budget)
+        if self.processor is None:
+            self._load_or_process()
+        
+        if cache_size:
+            for method_name in CACHED_TOOLS:
+                setattr(self, method_name, cached_results(getattr(self, method_name), cache_size))
     
     def _load_or_process(self):
         """Load processed data or process CSV if not available."""
@@ -45,6 +75,25 @@ class CSVTyrePlexTools:
             self.processor.save_to_disk('models')
             logger.success("✅ CSV processing complete")
     
+    def _sorted_tyres(self, tyre_size: str) -> Tuple[Tuple[Mapping, ...], np.ndarray]:
+        """
+        Unique tyres for a size sorted by price, plus a price array for
+        range lookups. Cached per size; the tyres are read-only views and
+        the price array is non-writeable, so callers can't alter the cache.
+        """
+        tyres = tuple(
+            MappingProxyType(dict(tyre))
+            for tyre in self.processor.get_tyres_by_size(tyre_size, budget='all')
+        )
+        prices = np.fromiter((t['price'] for t in tyres), dtype=float, count=len(tyres))
+        prices.flags.writeable = False
+        return tyres, prices
+    
+    def _tyres_for_budget(self, tyre_size: str, budget: str) -> Tuple[Mapping, ...]:
+        """Tyres for a size within a budget band, cached per (size, budget)."""
+        sorted_tyres, _ = self._sorted_tyres(tyre_size)
+        return CSVProcessor.filter_by_budget(sorted_tyres, budget)
+    
     def identify_vehicle_tyre_size(
         self,
         vehicle_make: str,
@@ -103,7 +152,7 @@ class CSVTyrePlexTools:
         Returns:
             Dictionary with tyre recommendations
         """
-        tyres = self.processor.get_tyres_by_size(tyre_size, budget=budget_range)
+        tyres = self._tyres_for_budget(tyre_size, budget_range)
         
         if not tyres:
             return {
@@ -155,7 +204,7 @@ class CSVTyrePlexTools:
         Returns:
             Comparison dictionary
         """
-        all_tyres = self.processor.get_tyres_by_size(tyre_size, budget='all')
+        all_tyres, _ = self._sorted_tyres(tyre_size)
         
         brand1_tyres = [t for t in all_tyres if t['brand'].lower() == brand1.lower()]
         brand2_tyres = [t for t in all_tyres if t['brand'].lower() == brand2.lower()]
@@ -258,13 +307,14 @@ class CSVTyrePlexTools:
         }
     
     def get_all_brands(self) -> Dict:
-        """Get list of all available tyre brands."""
-        stats = self.processor.get_statistics()
+        """Get all available tyre brands (sorted, as an immutable tuple)."""
+        if self._brands is None:
+            self._brands = tuple(sorted(self.processor.stats['unique_brands']))
         
         return {
             "success": True,
-            "total_brands": len(stats['brands']),
-            "brands": stats['brands']
+            "total_brands": len(self._brands),
+            "brands": self._brands
         }
     
     def get_price_range_tyres(
@@ -284,12 +334,12 @@ class CSVTyrePlexTools:
         Returns:
             Filtered tyres
         """
-        all_tyres = self.processor.get_tyres_by_size(tyre_size, budget='all')
+        all_tyres, prices = self._sorted_tyres(tyre_size)
         
-        filtered = [
-            t for t in all_tyres
-            if min_price <= t['price'] <= max_price
-        ]
+        # Tyres are sorted by price, so the range is one contiguous slice
+        start = np.searchsorted(prices, min_price, side='left')
+        end = np.searchsorted(prices, max_price, side='right')
+        filtered = all_tyres[start:end]
         
         if not filtered:
             return {
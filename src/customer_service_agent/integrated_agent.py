@@ -5,7 +5,9 @@ Combines ML predictions with CSV lookups for best results
 
 import sys
 from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent.parent))
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
 from typing import Dict, List, Optional
 from loguru import logger
@@ -35,13 +37,19 @@ class IntegratedTyrePlexAgent:
     3. Fallback mechanisms for robustness
     """
     
-    def __init__(self):
-        """Initialize both ML and CSV systems."""
-        self.ml_engine = None
+    def __init__(self, ml_engine=None, csv_processor=None):
+        """
+        Initialize both ML and CSV systems.
+        
+        Args:
+            ml_engine: Already loaded MLInferenceEngine to share
+            csv_processor: Already loaded CSVProcessor to share
+        """
+        self.ml_engine = ml_engine
         self.csv_tools = None
         
         # Initialize ML engine
-        if ML_AVAILABLE:
+        if self.ml_engine is None and ML_AVAILABLE:
             try:
                 self.ml_engine = MLInferenceEngine()
                 logger.success("✅ ML engine initialized")
@@ -51,7 +59,7 @@ class IntegratedTyrePlexAgent:
         # Initialize CSV tools
         if CSV_AVAILABLE:
             try:
-                self.csv_tools = CSVTyrePlexTools()
+                self.csv_tools = CSVTyrePlexTools(processor=csv_processor)
                 logger.success("✅ CSV tools initialized")
             except Exception as e:
                 logger.warning(f"⚠️  CSV tools not available: {e}")
@@ -136,18 +144,18 @@ class IntegratedTyrePlexAgent:
                     top_k=5
                 )
                 
-                # Get price predictions for each brand
+                # Get price predictions for all brands in one model call
+                prices = self.ml_engine.predict_price_batch(
+                    vehicle_make, vehicle_model, "Car",
+                    1000000, [brand['brand'] for brand in brands], size_pred['tyre_size']
+                )
+                
                 recommendations = []
-                for brand in brands:
-                    price_pred = self.ml_engine.predict_price(
-                        vehicle_make, vehicle_model, "Car",
-                        1000000, brand['brand'], size_pred['tyre_size']
-                    )
-                    
+                for i, brand in enumerate(brands):
                     recommendations.append({
                         'brand': brand['brand'],
                         'model': 'Predicted',
-                        'price': int(price_pred.get('predicted_price', 0)),
+                        'price': int(prices[i]) if prices is not None else 0,
                         'confidence': brand['confidence_percent'],
                         'source': 'ml'
                     })
@@ -182,15 +190,11 @@ class IntegratedTyrePlexAgent:
         if self.ml_engine:
             logger.info("Using ML for brand comparison")
             
-            price1 = self.ml_engine.predict_price(
-                "Generic", "Model", "Car", 1000000,
-                brand1, tyre_size
-            )
-            
-            price2 = self.ml_engine.predict_price(
+            prices = self.ml_engine.predict_price_batch(
                 "Generic", "Model", "Car", 1000000,
-                brand2, tyre_size
+                [brand1, brand2], tyre_size
             )
+            price1, price2 = prices if prices is not None else (0, 0)
             
             return {
                 'success': True,
@@ -198,17 +202,14 @@ class IntegratedTyrePlexAgent:
                 'tyre_size': tyre_size,
                 'brand1': {
                     'name': brand1,
-                    'price': int(price1.get('predicted_price', 0))
+                    'price': int(price1)
                 },
                 'brand2': {
                     'name': brand2,
-                    'price': int(price2.get('predicted_price', 0))
+                    'price': int(price2)
                 },
-                'price_difference': abs(
-                    int(price1.get('predicted_price', 0)) -
-                    int(price2.get('predicted_price', 0))
-                ),
-                'cheaper_brand': brand1 if price1.get('predicted_price', 0) < price2.get('predicted_price', 0) else brand2
+                'price_difference': abs(int(price1) - int(price2)),
+                'cheaper_brand': brand1 if price1 < price2 else brand2
             }
         
         return {'success': False, 'error': 'No data available'}
@@ -280,7 +281,7 @@ class IntegratedTyrePlexAgent:
         if self.csv_tools:
             result = self.csv_tools.get_all_brands()
             if result.get('success'):
-                return result['brands']
+                return list(result['brands'])
         
         # Default brands
         return [
@@ -303,7 +304,7 @@ class IntegratedTyrePlexAgent:
         return {
             'ml_available': self.ml_engine is not None,
             'csv_available': self.csv_tools is not None,
-            'ml_models': list(self.ml_engine.models.keys()) if self.ml_engine else [],
+            'ml_models': self.ml_engine.available_models if self.ml_engine else [],
             'recommendation': 'Both systems available' if (self.ml_engine and self.csv_tools) else 'Limited functionality'
         }
 
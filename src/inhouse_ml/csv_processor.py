@@ -5,6 +5,8 @@ Handles your actual CSV with 35 columns and large dataset (50MB+)
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pac
 from typing import Dict, List, Tuple, Optional
 import json
 from pathlib import Path
@@ -13,6 +15,22 @@ from collections import defaultdict
 from loguru import logger
 
 
+# csv_data.pkl is one large pickle of nested dicts; read/write it in 1 MB blocks
+PICKLE_PROTOCOL = 5
+IO_BUFFER_SIZE = 1 << 20
+
+# Arrow parses the CSV in blocks of this size across threads
+CSV_BLOCK_SIZE = 1 << 20
+
+
+def _infer_numeric(column: pd.Series) -> pd.Series:
+    """Parse a column of strings as numbers if every value is numeric, as pd.read_csv does."""
+    try:
+        return pd.to_numeric(column)
+    except (ValueError, TypeError):
+        return column
+
+
 class CSVProcessor:
     """
     Processes your vehicle_tyre_mapping.csv file.
@@ -45,7 +63,23 @@ class CSVProcessor:
         chunk_num = 0
         
         try:
-            for chunk in pd.read_csv(self.csv_path, chunksize=chunk_size, low_memory=False):
+            # Multithreaded Arrow parse of the whole file. Columns are read as
+            # strings, since Arrow's first-block type inference fails on mixed
+            # columns, then typed per chunk the way pd.read_csv(chunksize=...)
+            # infers them, so stored values (e.g. width 195.0) stay the same
+            header = pac.open_csv(self.csv_path).schema.names
+            table = pac.read_csv(
+                self.csv_path,
+                read_options=pac.ReadOptions(block_size=CSV_BLOCK_SIZE, use_threads=True),
+                convert_options=pac.ConvertOptions(
+                    column_types={col: pa.string() for col in header},
+                    strings_can_be_null=True
+                )
+            )
+            
+            for offset in range(0, table.num_rows, chunk_size):
+                chunk = table.slice(offset, chunk_size).to_pandas().fillna(np.nan).apply(_infer_numeric)
+                chunk.index += offset
                 chunk_num += 1
                 logger.info(f"Processing chunk {chunk_num} ({len(chunk)} rows)...")
                 
@@ -64,7 +98,8 @@ class CSVProcessor:
         
     def _process_chunk(self, chunk: pd.DataFrame):
         """Process a single chunk of data."""
-        for idx, row in chunk.iterrows():
+        # Plain dict rows: far cheaper to build and index than iterrows() Series
+        for idx, row in zip(chunk.index, chunk.to_dict('records')):
             try:
                 self._process_row(row)
                 self.stats['total_records'] += 1
@@ -72,7 +107,7 @@ class CSVProcessor:
                 logger.warning(f"Error processing row {idx}: {e}")
                 continue
     
-    def _process_row(self, row: pd.Series):
+    def _process_row(self, row: Dict):
         """Process a single row from CSV."""
         # Extract vehicle info
         make = str(row['Vehicle Make']).strip()
@@ -128,7 +163,7 @@ class CSVProcessor:
             # Index by brand
             self.brand_index[rear_tyre['brand'].lower()].append(rear_tyre)
     
-    def _extract_tyre_info(self, row: pd.Series, position: str) -> Optional[Dict]:
+    def _extract_tyre_info(self, row: Dict, position: str) -> Optional[Dict]:
         """Extract tyre information from row."""
         try:
             brand = str(row[f'{position} Tyre Brand']).strip()
@@ -233,7 +268,17 @@ class CSVProcessor:
         # Sort by price
         sorted_tyres = sorted(unique_tyres, key=lambda x: x['price'])
         
-        # Filter by budget
+        return self.filter_by_budget(sorted_tyres, budget)
+    
+    @staticmethod
+    def filter_by_budget(sorted_tyres: List[Dict], budget: str) -> List[Dict]:
+        """
+        Slice price-sorted tyres to a budget band.
+        
+        Args:
+            sorted_tyres: Tyres sorted by ascending price
+            budget: 'budget' (cheapest 30%), 'mid' (30-70%), 'premium' (top 30%), or 'all'
+        """
         if budget == 'budget':
             cutoff = max(3, int(len(sorted_tyres) * 0.3))
             return sorted_tyres[:cutoff]
@@ -300,8 +345,8 @@ class CSVProcessor:
             'stats': self.stats
         }
         
-        with open(f'{output_dir}/csv_data.pkl', 'wb') as f:
-            pickle.dump(data, f)
+        with open(f'{output_dir}/csv_data.pkl', 'wb', buffering=IO_BUFFER_SIZE) as f:
+            pickle.dump(data, f, protocol=PICKLE_PROTOCOL)
         
         # Also save as JSON for inspection
         json_data = {
@@ -327,7 +372,7 @@ class CSVProcessor:
         """Load processed data from disk."""
         processor = cls()
         
-        with open(f'{input_dir}/csv_data.pkl', 'rb') as f:
+        with open(f'{input_dir}/csv_data.pkl', 'rb', buffering=IO_BUFFER_SIZE) as f:
             data = pickle.load(f)
         
         processor.vehicle_lookup = defaultdict(list, data['vehicle_lookup'])
@@ -8,7 +8,8 @@ from pathlib import Path
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 from elasticsearch import Elasticsearch
 from elasticsearch.helpers import bulk
@@ -245,13 +245,19 @@ class MongoDBManager:
     
     # Statistics
     def get_statistics(self) -> Dict:
-        """Get database statistics."""
+        """
+        Get database statistics.
+        
+        Collection totals come from collection metadata
+        (estimated_document_count) instead of scanning every document;
+        status breakdowns are still exact (they use the status index).
+        """
         return {
-            'vehicles': self.db.vehicles.count_documents({}),
-            'tyres': self.db.tyres.count_documents({}),
-            'leads': self.db.leads.count_documents({}),
-            'bookings': self.db.bookings.count_documents({}),
-            'call_logs': self.db.call_logs.count_documents({}),
+            'vehicles': self.db.vehicles.estimated_document_count(),
+            'tyres': self.db.tyres.estimated_document_count(),
+            'leads': self.db.leads.estimated_document_count(),
+            'bookings': self.db.bookings.estimated_document_count(),
+            'call_logs': self.db.call_logs.estimated_document_count(),
             'leads_by_status': {
                 'new': self.db.leads.count_documents({'status': 'new'}),
                 'contacted': self.db.leads.count_documents({'status': 'contacted'}),
@@ -6,6 +6,7 @@ Handles SMS and WhatsApp notifications for bookings and reminders.
 from typing import Dict, Optional
 from datetime import datetime
 from loguru import logger
+import orjson
 import requests
 
 
@@ -32,6 +33,7 @@ class NotificationService:
         self.sms_api_key = sms_api_key
         self.sms_api_secret = sms_api_secret
         self.whatsapp_api_key = whatsapp_api_key
+        self.http = requests.Session()
     
     def send_booking_confirmation_sms(
         self,
@@ -225,7 +227,7 @@ TyrePlex Team"""
             #     "mobiles": phone_number,
             #     "message": message
             # }
-            # response = requests.post(url, json=payload)
+            # response = self._post_json(url, payload)
             
             logger.info(f"✅ SMS sent via MSG91 to {phone_number}")
             return True
@@ -243,6 +245,27 @@ TyrePlex Team"""
             logger.error(f"Failed to send SMS via Gupshup: {e}")
             return False
     
+    def _post_json(self, url: str, payload: Dict) -> requests.Response:
+        """
+        POST a JSON payload to a provider endpoint.
+        
+        The body is serialized with orjson instead of the stdlib encoder that
+        requests uses for ``json=``, and sent over the shared HTTP session.
+        
+        Args:
+            url: Provider endpoint
+            payload: JSON-serializable request body
+            
+        Returns:
+            Provider response
+        """
+        return self.http.post(
+            url,
+            data=orjson.dumps(payload),
+            headers={'Content-Type': 'application/json'},
+            timeout=10
+        )
+    
     def _format_booking_confirmation_message(self, booking_data: Dict) -> str:
         """Format booking confirmation message."""
         return f"""TyrePlex Booking Confirmed!
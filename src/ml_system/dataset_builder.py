@@ -3,16 +3,236 @@ Dataset Builder for TyrePlex ML System
 Prepares training data from CSV for ML models
 """
 
+import os
+import hashlib
+import warnings
+import itertools
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from scipy import sparse
+import pyarrow as pa
+import pyarrow.csv as pac
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import Pipeline, make_pipeline
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
-import pickle
+from joblib import Memory, dump
 from loguru import logger
 
 
+# Columns used by the dataset builders; the rest of the CSV is skipped while parsing
+USECOLS = [
+    'Vehicle Make', 'Vehicle Model', 'Vehicle Variant', 'Vehicle Type',
+    'Fuel Type', 'Vehicle Price',
+    'Front Tyre Size (Vehicle Spec)', 'Front Tyre Brand', 'Front Tyre Type',
+    'Front Tyre Width', 'Front Tyre Aspect Ratio', 'Front Rim Size',
+    'Front Tyre MRP', 'Front Tyre Price', 'Rear Tyre Price'
+]
+
+# Explicit column types so the parser skips dtype inference
+DTYPES = {
+    'Vehicle Make': 'category',
+    'Vehicle Model': 'category',
+    'Vehicle Variant': 'category',
+    'Vehicle Type': 'category',
+    'Fuel Type': 'category',
+    'Front Tyre Size (Vehicle Spec)': 'category',
+    'Front Tyre Brand': 'category',
+    'Front Tyre Type': 'category',
+    'Vehicle Price': np.float32,
+    'Front Tyre Width': np.float32,
+    'Front Tyre Aspect Ratio': np.float32,
+    'Front Rim Size': np.float32,
+    'Front Tyre MRP': np.float32,
+    'Front Tyre Price': np.float32,
+    'Rear Tyre Price': np.float32
+}
+
+# Arrow equivalents of DTYPES: dictionary-encoded strings convert to pandas categoricals
+ARROW_TYPES = {
+    col: pa.dictionary(pa.int32(), pa.string()) if dtype == 'category' else pa.float32()
+    for col, dtype in DTYPES.items()
+}
+
+# Feature name -> CSV column for each structured task
+BRAND_FEATURES = {
+    'vehicle_make': 'Vehicle Make',
+    'vehicle_model': 'Vehicle Model',
+    'vehicle_type': 'Vehicle Type',
+    'fuel_type': 'Fuel Type',
+    'vehicle_price': 'Vehicle Price',
+    'tyre_size': 'Front Tyre Size (Vehicle Spec)',
+    'tyre_width': 'Front Tyre Width',
+    'rim_size': 'Front Rim Size'
+}
+
+PRICE_FEATURES = {
+    'vehicle_make': 'Vehicle Make',
+    'vehicle_model': 'Vehicle Model',
+    'vehicle_type': 'Vehicle Type',
+    'vehicle_price': 'Vehicle Price',
+    'tyre_brand': 'Front Tyre Brand',
+    'tyre_size': 'Front Tyre Size (Vehicle Spec)',
+    'tyre_width': 'Front Tyre Width',
+    'aspect_ratio': 'Front Tyre Aspect Ratio',
+    'rim_size': 'Front Rim Size',
+    'tube_type': 'Front Tyre Type'
+}
+
+SIZE_FEATURES = {
+    'vehicle_make': 'Vehicle Make',
+    'vehicle_model': 'Vehicle Model',
+    'vehicle_variant': 'Vehicle Variant',
+    'vehicle_type': 'Vehicle Type',
+    'fuel_type': 'Fuel Type',
+    'vehicle_price': 'Vehicle Price'
+}
+
+# Categorical columns used by more than one task; encoded once after cleaning
+SHARED_COLS = [
+    'Vehicle Make', 'Vehicle Model', 'Vehicle Type', 'Fuel Type',
+    'Front Tyre Size (Vehicle Spec)', 'Front Tyre Brand'
+]
+
+# Optional numeric CSV columns; left out of the features when absent
+OPTIONAL_NUMERIC = ['Front Tyre Width', 'Front Tyre Aspect Ratio', 'Front Rim Size']
+
+# Fallback values for other optional CSV columns
+OPTIONAL_DEFAULTS = {
+    'Front Tyre Type': 'Tubeless'
+}
+
+
+# Structured task -> (features, encoder key prefix, scaler key, target column, target encoder key)
+STRUCTURED_TASKS = {
+    'brand': (BRAND_FEATURES, '', 'brand_scaler', 'Front Tyre Brand', 'brand'),
+    'price': (PRICE_FEATURES, 'price_', 'price_scaler', 'Front Tyre Price', None),
+    'size': (SIZE_FEATURES, 'size_', 'size_scaler', 'Front Tyre Size (Vehicle Spec)', 'tyre_size')
+}
+
+# Dataset name -> description used in logs
+DATASET_DESCRIPTIONS = {
+    'brand': 'brand recommendation',
+    'price': 'price prediction',
+    'size': 'tyre size prediction',
+    'intent': 'intent classification'
+}
+
+
+# Synthetic training phrases per customer intent
+INTENT_PHRASES = {
+    'vehicle_inquiry': [
+        'I have a BMW Z4',
+        'What size tyres for Maruti Swift',
+        'My car is Hyundai Creta',
+        'I drive a Honda City',
+        'Tell me about tyres for my vehicle',
+        'Which tyres fit my car',
+        'I need tyres for my bike',
+        'What tyres does my vehicle need'
+    ],
+    'tyre_recommendation': [
+        'Suggest good tyres',
+        'What are the best tyres',
+        'Recommend tyres for city driving',
+        'I need budget tyres',
+        'Show me premium options',
+        'What tyres do you recommend',
+        'Best tyres for highway',
+        'Good tyres for my budget'
+    ],
+    'price_inquiry': [
+        'How much does it cost',
+        'What is the price',
+        'How much for MRF tyres',
+        'Price of Apollo tyres',
+        'What is your rate',
+        'How much will it cost',
+        'Price range for tyres',
+        'Cost of installation'
+    ],
+    'brand_comparison': [
+        'Compare MRF and CEAT',
+        'Which is better Michelin or Bridgestone',
+        'Difference between Apollo and MRF',
+        'MRF vs CEAT which is good',
+        'Compare these brands',
+        'Which brand is better',
+        'Tell me about brand differences',
+        'Compare tyre brands'
+    ],
+    'availability_check': [
+        'Is it available',
+        'Do you have stock',
+        'Available in Mumbai',
+        'When can I get it',
+        'Is it in stock',
+        'Can I get it today',
+        'Delivery time',
+        'How soon can you deliver'
+    ],
+    'booking_request': [
+        'I want to book',
+        'Book an appointment',
+        'Schedule installation',
+        'I will take it',
+        'Book for tomorrow',
+        'Make a booking',
+        'Reserve for me',
+        'I want to buy'
+    ]
+}
+
+# Flattened intent phrases and their label names, built once at import
+INTENT_TEXTS = np.array(
+    list(itertools.chain.from_iterable(INTENT_PHRASES.values())), dtype=object
+)
+INTENT_LABEL_NAMES = np.repeat(
+    list(INTENT_PHRASES.keys()),
+    [len(phrases) for phrases in INTENT_PHRASES.values()]
+)
+
+
+def _file_key(path) -> str:
+    """Cache key for a file's version: its path, mtime and size (the contents are never read)."""
+    stat = os.stat(path)
+    return f"{path}:{stat.st_mtime}:{stat.st_size}"
+
+
+def _build_datasets(csv_key: str, source_key: str, builder: 'DatasetBuilder') -> Tuple[Dict, Dict, Dict]:
+    """
+    Run every dataset builder and return (datasets, encoders, scalers).
+    
+    Memoized on disk by save_datasets. The CSV and builder source file keys
+    are the cache key; the builder itself is ignored so its DataFrame is
+    never hashed.
+    """
+    # The structured tasks are built in one fused pass over the cleaned
+    # frame; the intent dataset is independent, so build it alongside
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        structured = executor.submit(builder._build_all_structured)
+        intent = executor.submit(builder.create_intent_classification_dataset)
+        datasets = {**structured.result(), 'intent': intent.result()}
+    
+    return datasets, builder.encoders, builder.scalers
+
+
+def _fit_intent_vectorizer(texts: np.ndarray) -> Pipeline:
+    """
+    Fit the intent vectorizer (memoized on disk by the builder).
+    
+    Hashed token counts followed by TF-IDF weighting: there is no vocabulary
+    dict to build or pickle, and transform cost does not grow with it.
+    """
+    return make_pipeline(
+        HashingVectorizer(n_features=1024, alternate_sign=False, norm=None),
+        TfidfTransformer()
+    ).fit(texts)
+
+
 class DatasetBuilder:
     """
     Builds ML-ready datasets from TyrePlex CSV.
@@ -23,24 +243,51 @@ class DatasetBuilder:
     4. Customer intent classification
     """
     
-    def __init__(self, csv_path: str = 'vehicle_tyre_mapping.csv'):
+    def __init__(
+        self,
+        csv_path: str = 'vehicle_tyre_mapping.csv',
+        cache_dir: str = 'data/processed'
+    ):
         self.csv_path = csv_path
+        self.cache_dir = cache_dir
         self.df = None
         self.encoders = {}
         self.scalers = {}
+        self._codes = None
+        self._categories = {}
         
+    def _clean_cache_path(self) -> Path:
+        """Parquet cache location for the cleaned frame, keyed on the CSV's mtime and size."""
+        digest = hashlib.sha1(_file_key(self.csv_path).encode()).hexdigest()
+        return Path(self.cache_dir) / f'_clean_{digest}.parquet'
+    
     def load_and_clean_data(self) -> pd.DataFrame:
-        """Load and clean CSV data."""
-        logger.info(f"Loading data from {self.csv_path}...")
-        
-        # Read CSV in chunks for large files
-        chunks = []
-        chunk_size = 10000
+        """Load and clean CSV data (cached as Parquet until the CSV changes)."""
+        cache_path = self._clean_cache_path()
+        if cache_path.exists():
+            logger.info(f"Loading cleaned data from {cache_path}...")
+            self.df = pd.read_parquet(cache_path, engine='pyarrow')
+            logger.success(f"✅ Loaded {len(self.df)} cleaned records from cache")
+            
+            self._encode_shared_categoricals()
+            return self.df
         
-        for chunk in pd.read_csv(self.csv_path, chunksize=chunk_size, low_memory=False):
-            chunks.append(chunk)
+        logger.info(f"Loading data from {self.csv_path}...")
         
-        self.df = pd.concat(chunks, ignore_index=True)
+        # Typed, multithreaded Arrow parse of the used columns only; optional
+        # columns missing from the CSV are skipped
+        header = pac.open_csv(self.csv_path).schema.names
+        columns = [col for col in USECOLS if col in header]
+        table = pac.read_csv(
+            self.csv_path,
+            read_options=pac.ReadOptions(block_size=64 << 20, use_threads=True),
+            convert_options=pac.ConvertOptions(
+                include_columns=columns,
+                column_types={col: ARROW_TYPES[col] for col in columns},
+                strings_can_be_null=True
+            )
+        )
+        self.df = table.to_pandas()
         logger.success(f"✅ Loaded {len(self.df)} records")
         
         # Clean data
@@ -53,22 +300,229 @@ class DatasetBuilder:
             'Front Tyre Price'
         ]
         
-        initial_count = len(self.df)
-        self.df = self.df.dropna(subset=critical_cols)
-        logger.info(f"Removed {initial_count - len(self.df)} rows with missing data")
+        # Missing critical data and zero prices are dropped with one mask and one copy
+        complete = self.df[critical_cols].notna().all(axis=1).to_numpy()
+        priced = self.df['Front Tyre Price'].to_numpy() > 0
+        logger.info(f"Removed {int((~complete).sum())} rows with missing data")
         
-        # Remove rows with zero prices
-        self.df = self.df[self.df['Front Tyre Price'] > 0]
+        self.df = self.df.loc[complete & priced].reset_index(drop=True)
         
         # Fill missing values
+        front_price = self.df['Front Tyre Price']
         self.df['Vehicle Price'] = self.df['Vehicle Price'].fillna(0)
-        self.df['Front Tyre MRP'] = self.df['Front Tyre MRP'].fillna(self.df['Front Tyre Price'])
-        self.df['Rear Tyre Price'] = self.df['Rear Tyre Price'].fillna(self.df['Front Tyre Price'])
+        self.df['Front Tyre MRP'] = self.df['Front Tyre MRP'].fillna(front_price)
+        self.df['Rear Tyre Price'] = self.df['Rear Tyre Price'].fillna(front_price)
+        
+        # Drop categories that only appeared in removed rows, and sort the rest
+        # (Arrow dictionaries keep first-seen order; LabelEncoder needs sorted classes)
+        for col in self.df.select_dtypes('category').columns:
+            values = self.df[col].cat.remove_unused_categories()
+            self.df[col] = values.cat.reorder_categories(values.cat.categories.sort_values())
         
         logger.success(f"✅ Cleaned data: {len(self.df)} records remaining")
         
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.df.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+        except Exception as e:
+            logger.warning(f"⚠️  Could not cache cleaned data: {e}")
+        
+        self._encode_shared_categoricals()
+        
         return self.df
     
+    @staticmethod
+    def _code_dtype(n_categories: int) -> type:
+        """Smallest signed int dtype that holds codes 0..n-1 plus the -1 sentinel."""
+        if n_categories < 128:
+            return np.int8
+        if n_categories < 32768:
+            return np.int16
+        return np.int32
+    
+    def _encode_shared_categoricals(self):
+        """Encode the categorical columns shared by the structured tasks once."""
+        codes = {}
+        for col in SHARED_COLS:
+            cat = pd.Categorical(self.df[col])
+            codes[col] = cat.codes.astype(self._code_dtype(len(cat.categories)))
+            self._categories[col] = cat.categories
+        
+        self._codes = pd.DataFrame(codes, index=self.df.index)
+    
+    @staticmethod
+    def _label_encoder(categories) -> LabelEncoder:
+        """Wrap fitted categories in a LabelEncoder for the inference engine."""
+        encoder = LabelEncoder()
+        encoder.classes_ = np.asarray(categories)
+        return encoder
+    
+    def _encode(self, key: str, values, source: Optional[str] = None) -> np.ndarray:
+        """
+        Encode a categorical column to integer codes.
+        
+        Uses pandas Categorical codes instead of LabelEncoder.fit_transform.
+        The fitted categories are stored as a LabelEncoder so the inference
+        engine can keep calling transform/inverse_transform. Missing values
+        (and unseen values on reuse) are encoded as -1. Codes use the smallest
+        int dtype that fits the number of categories.
+        
+        When source is one of SHARED_COLS, the codes computed in
+        _encode_shared_categoricals are reused instead of re-encoding.
+        """
+        if source in self._categories:
+            categories = self._categories[source]
+            if key not in self.encoders:
+                self.encoders[key] = self._label_encoder(categories)
+            if categories.equals(pd.Index(self.encoders[key].classes_)):
+                return self._codes[source].to_numpy()
+        
+        if key not in self.encoders:
+            cat = pd.Categorical(values)
+            self.encoders[key] = self._label_encoder(cat.categories)
+            return cat.codes.astype(self._code_dtype(len(cat.categories)))
+        
+        classes = pd.Index(self.encoders[key].classes_)
+        dtype = self._code_dtype(len(classes))
+        if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+            # Look up the (few) categories once, then gather by code
+            lookup = classes.get_indexer(values.cat.categories)
+            codes = values.cat.codes.to_numpy()
+            return np.where(codes >= 0, lookup[codes], -1).astype(dtype)
+        
+        return classes.get_indexer(values).astype(dtype)
+    
+    def _scale(self, key: str, values: pd.DataFrame) -> np.ndarray:
+        """
+        Standardize numerical columns in float32 with a single array operation.
+        
+        Fits on first use. The statistics are stored as a fitted StandardScaler
+        so the inference engine can keep calling transform. Like
+        StandardScaler.fit, missing values are ignored when fitting and stay
+        missing in the output.
+        """
+        X = values.to_numpy(dtype=np.float32)
+        
+        if key not in self.scalers:
+            with warnings.catch_warnings():
+                # An all-missing column has no statistics; it stays NaN
+                warnings.simplefilter('ignore', RuntimeWarning)
+                mean = np.nanmean(X, axis=0, dtype=np.float32)
+                std = np.nanstd(X, axis=0, dtype=np.float32)
+            std[std == 0] = 1
+            observed = np.count_nonzero(~np.isnan(X), axis=0)
+            
+            scaler = StandardScaler()
+            scaler.mean_ = mean.astype(np.float64)
+            scaler.scale_ = std.astype(np.float64)
+            scaler.var_ = scaler.scale_ ** 2
+            # Per-feature counts only when values were missing, as StandardScaler does
+            scaler.n_samples_seen_ = len(X) if (observed == len(X)).all() else observed
+            scaler.n_features_in_ = X.shape[1]
+            scaler.feature_names_in_ = np.asarray(values.columns, dtype=object)
+            self.scalers[key] = scaler
+        
+        scaler = self.scalers[key]
+        return (X - scaler.mean_.astype(np.float32)) / scaler.scale_.astype(np.float32)
+    
+    def _select_features(self, columns: Dict[str, str]) -> pd.DataFrame:
+        """
+        Select a task's source columns in one pass and rename them to feature names.
+        
+        Optional numeric columns missing from the CSV are skipped rather than
+        filled with a constant, zero-variance column.
+        """
+        missing = [
+            col for col in OPTIONAL_NUMERIC
+            if col in columns.values() and col not in self.df.columns
+        ]
+        if missing:
+            logger.warning(f"⚠️  Skipping features for missing columns: {', '.join(missing)}")
+            columns = {name: col for name, col in columns.items() if col not in missing}
+        
+        features = self.df.reindex(columns=list(columns.values()))
+        
+        for col in columns.values():
+            if col not in self.df.columns:
+                features[col] = OPTIONAL_DEFAULTS[col]
+        
+        features.columns = list(columns.keys())
+        return features
+    
+    @staticmethod
+    def _to_matrix_frame(columns: Dict[str, np.ndarray], index: pd.Index) -> pd.DataFrame:
+        """Assemble encoded and scaled feature columns into a single float32 block.
+        
+        The block is column-major so per-feature scans (scaling, tree
+        split search) read contiguous memory.
+        """
+        matrix = np.empty((len(index), len(columns)), dtype=np.float32, order='F')
+        for i, values in enumerate(columns.values()):
+            matrix[:, i] = values
+        return pd.DataFrame(matrix, columns=list(columns), index=index, copy=False)
+    
+    def _build_all_structured(
+        self,
+        tasks: Optional[List[str]] = None
+    ) -> Dict[str, Tuple[pd.DataFrame, pd.Series]]:
+        """
+        Build the structured datasets (brand, price, size) in one pass.
+        
+        The source columns of every requested task are selected from the
+        cleaned frame once. Categorical features reuse the shared codes and
+        each task's scaler is fitted on its slice of the same numeric block.
+        
+        Returns:
+            Dictionary of task name -> (features, target)
+        """
+        tasks = tasks or list(STRUCTURED_TASKS)
+        
+        # One selection over the union of the tasks' source columns
+        sources = {
+            col: col
+            for task in tasks
+            for col in STRUCTURED_TASKS[task][0].values()
+        }
+        frame = self._select_features(sources)
+        
+        datasets = {}
+        for task in tasks:
+            feature_cols, prefix, scaler_key, target_col, target_key = STRUCTURED_TASKS[task]
+            logger.info(f"\n📊 Creating {DATASET_DESCRIPTIONS[task]} dataset...")
+            
+            present = {name: col for name, col in feature_cols.items() if col in frame.columns}
+            numerical_cols = [name for name, col in present.items() if DTYPES[col] != 'category']
+            
+            # Scale numerical features
+            numerical = frame[[present[name] for name in numerical_cols]]
+            numerical.columns = numerical_cols
+            scaled = self._scale(scaler_key, numerical)
+            
+            # Encode categorical features, keeping the task's feature order
+            columns = {}
+            for name, col in present.items():
+                if name in numerical_cols:
+                    columns[name] = scaled[:, numerical_cols.index(name)]
+                else:
+                    columns[name] = self._encode(f'{prefix}{name}', frame[col], col)
+            features = self._to_matrix_frame(columns, frame.index)
+            
+            # Target (encoded for the classification tasks)
+            target = self.df[target_col]
+            if target_key is not None:
+                target = pd.Series(self._encode(target_key, target, target_col))
+            
+            logger.success(f"✅ Created dataset: {len(features)} samples, {len(features.columns)} features")
+            if target_key is None:
+                logger.info(f"   Price range: ₹{target.min():.0f} - ₹{target.max():.0f}")
+                logger.info(f"   Mean price: ₹{target.mean():.0f}")
+            else:
+                logger.info(f"   Unique {target_col}: {target.nunique()}")
+            
+            datasets[task] = (features, target)
+        
+        return datasets
+    
     def create_brand_recommendation_dataset(self) -> Tuple[pd.DataFrame, pd.Series]:
         """
         Create dataset for brand recommendation model.
@@ -76,50 +530,7 @@ class DatasetBuilder:
         Features: Vehicle make, model, type, fuel type, price range, tyre size
         Target: Tyre brand
         """
-        logger.info("\n📊 Creating brand recommendation dataset...")
-        
-        # Features
-        features = pd.DataFrame({
-            'vehicle_make': self.df['Vehicle Make'],
-            'vehicle_model': self.df['Vehicle Model'],
-            'vehicle_type': self.df['Vehicle Type'],
-            'fuel_type': self.df['Fuel Type'],
-            'vehicle_price': self.df['Vehicle Price'],
-            'tyre_size': self.df['Front Tyre Size (Vehicle Spec)'],
-            'tyre_width': self.df.get('Front Tyre Width', 0),
-            'rim_size': self.df.get('Front Rim Size', 0)
-        })
-        
-        # Target
-        target = self.df['Front Tyre Brand']
-        
-        # Encode categorical features
-        for col in ['vehicle_make', 'vehicle_model', 'vehicle_type', 'fuel_type', 'tyre_size']:
-            if col not in self.encoders:
-                self.encoders[col] = LabelEncoder()
-                features[col] = self.encoders[col].fit_transform(features[col].astype(str))
-            else:
-                features[col] = self.encoders[col].transform(features[col].astype(str))
-        
-        # Encode target
-        if 'brand' not in self.encoders:
-            self.encoders['brand'] = LabelEncoder()
-            target = self.encoders['brand'].fit_transform(target.astype(str))
-        else:
-            target = self.encoders['brand'].transform(target.astype(str))
-        
-        # Scale numerical features
-        numerical_cols = ['vehicle_price', 'tyre_width', 'rim_size']
-        if 'brand_scaler' not in self.scalers:
-            self.scalers['brand_scaler'] = StandardScaler()
-            features[numerical_cols] = self.scalers['brand_scaler'].fit_transform(features[numerical_cols])
-        else:
-            features[numerical_cols] = self.scalers['brand_scaler'].transform(features[numerical_cols])
-        
-        logger.success(f"✅ Created dataset: {len(features)} samples, {len(features.columns)} features")
-        logger.info(f"   Unique brands: {len(np.unique(target))}")
-        
-        return features, pd.Series(target)
+        return self._build_all_structured(['brand'])['brand']
     
     def create_price_prediction_dataset(self) -> Tuple[pd.DataFrame, pd.Series]:
         """
@@ -128,46 +539,7 @@ class DatasetBuilder:
         Features: Vehicle info, tyre brand, model, size, specifications
         Target: Tyre price
         """
-        logger.info("\n📊 Creating price prediction dataset...")
-        
-        # Features
-        features = pd.DataFrame({
-            'vehicle_make': self.df['Vehicle Make'],
-            'vehicle_model': self.df['Vehicle Model'],
-            'vehicle_type': self.df['Vehicle Type'],
-            'vehicle_price': self.df['Vehicle Price'],
-            'tyre_brand': self.df['Front Tyre Brand'],
-            'tyre_size': self.df['Front Tyre Size (Vehicle Spec)'],
-            'tyre_width': self.df.get('Front Tyre Width', 0),
-            'aspect_ratio': self.df.get('Front Tyre Aspect Ratio', 0),
-            'rim_size': self.df.get('Front Rim Size', 0),
-            'tube_type': self.df.get('Front Tyre Type', 'Tubeless')
-        })
-        
-        # Target
-        target = self.df['Front Tyre Price']
-        
-        # Encode categorical features
-        for col in ['vehicle_make', 'vehicle_model', 'vehicle_type', 'tyre_brand', 'tyre_size', 'tube_type']:
-            if f'price_{col}' not in self.encoders:
-                self.encoders[f'price_{col}'] = LabelEncoder()
-                features[col] = self.encoders[f'price_{col}'].fit_transform(features[col].astype(str))
-            else:
-                features[col] = self.encoders[f'price_{col}'].transform(features[col].astype(str))
-        
-        # Scale numerical features
-        numerical_cols = ['vehicle_price', 'tyre_width', 'aspect_ratio', 'rim_size']
-        if 'price_scaler' not in self.scalers:
-            self.scalers['price_scaler'] = StandardScaler()
-            features[numerical_cols] = self.scalers['price_scaler'].fit_transform(features[numerical_cols])
-        else:
-            features[numerical_cols] = self.scalers['price_scaler'].transform(features[numerical_cols])
-        
-        logger.success(f"✅ Created dataset: {len(features)} samples, {len(features.columns)} features")
-        logger.info(f"   Price range: ₹{target.min():.0f} - ₹{target.max():.0f}")
-        logger.info(f"   Mean price: ₹{target.mean():.0f}")
-        
-        return features, target
+        return self._build_all_structured(['price'])['price']
     
     def create_tyre_size_prediction_dataset(self) -> Tuple[pd.DataFrame, pd.Series]:
         """
@@ -176,49 +548,9 @@ class DatasetBuilder:
         Features: Vehicle make, model, variant, type
         Target: Tyre size
         """
-        logger.info("\n📊 Creating tyre size prediction dataset...")
-        
-        # Features
-        features = pd.DataFrame({
-            'vehicle_make': self.df['Vehicle Make'],
-            'vehicle_model': self.df['Vehicle Model'],
-            'vehicle_variant': self.df['Vehicle Variant'],
-            'vehicle_type': self.df['Vehicle Type'],
-            'fuel_type': self.df['Fuel Type'],
-            'vehicle_price': self.df['Vehicle Price']
-        })
-        
-        # Target
-        target = self.df['Front Tyre Size (Vehicle Spec)']
-        
-        # Encode categorical features
-        for col in ['vehicle_make', 'vehicle_model', 'vehicle_variant', 'vehicle_type', 'fuel_type']:
-            if f'size_{col}' not in self.encoders:
-                self.encoders[f'size_{col}'] = LabelEncoder()
-                features[col] = self.encoders[f'size_{col}'].fit_transform(features[col].astype(str))
-            else:
-                features[col] = self.encoders[f'size_{col}'].transform(features[col].astype(str))
-        
-        # Encode target
-        if 'tyre_size' not in self.encoders:
-            self.encoders['tyre_size'] = LabelEncoder()
-            target = self.encoders['tyre_size'].fit_transform(target.astype(str))
-        else:
-            target = self.encoders['tyre_size'].transform(target.astype(str))
-        
-        # Scale numerical features
-        if 'size_scaler' not in self.scalers:
-            self.scalers['size_scaler'] = StandardScaler()
-            features[['vehicle_price']] = self.scalers['size_scaler'].fit_transform(features[['vehicle_price']])
-        else:
-            features[['vehicle_price']] = self.scalers['size_scaler'].transform(features[['vehicle_price']])
-        
-        logger.success(f"✅ Created dataset: {len(features)} samples, {len(features.columns)} features")
-        logger.info(f"   Unique tyre sizes: {len(np.unique(target))}")
-        
-        return features, pd.Series(target)
+        return self._build_all_structured(['size'])['size']
     
-    def create_intent_classification_dataset(self) -> Tuple[pd.DataFrame, pd.Series]:
+    def create_intent_classification_dataset(self) -> Tuple[sparse.csr_matrix, pd.Series]:
         """
         Create synthetic dataset for customer intent classification.
         
@@ -232,101 +564,24 @@ class DatasetBuilder:
         """
         logger.info("\n📊 Creating intent classification dataset...")
         
-        # Synthetic training data
-        intents_data = {
-            'vehicle_inquiry': [
-                'I have a BMW Z4',
-                'What size tyres for Maruti Swift',
-                'My car is Hyundai Creta',
-                'I drive a Honda City',
-                'Tell me about tyres for my vehicle',
-                'Which tyres fit my car',
-                'I need tyres for my bike',
-                'What tyres does my vehicle need'
-            ],
-            'tyre_recommendation': [
-                'Suggest good tyres',
-                'What are the best tyres',
-                'Recommend tyres for city driving',
-                'I need budget tyres',
-                'Show me premium options',
-                'What tyres do you recommend',
-                'Best tyres for highway',
-                'Good tyres for my budget'
-            ],
-            'price_inquiry': [
-                'How much does it cost',
-                'What is the price',
-                'How much for MRF tyres',
-                'Price of Apollo tyres',
-                'What is your rate',
-                'How much will it cost',
-                'Price range for tyres',
-                'Cost of installation'
-            ],
-            'brand_comparison': [
-                'Compare MRF and CEAT',
-                'Which is better Michelin or Bridgestone',
-                'Difference between Apollo and MRF',
-                'MRF vs CEAT which is good',
-                'Compare these brands',
-                'Which brand is better',
-                'Tell me about brand differences',
-                'Compare tyre brands'
-            ],
-            'availability_check': [
-                'Is it available',
-                'Do you have stock',
-                'Available in Mumbai',
-                'When can I get it',
-                'Is it in stock',
-                'Can I get it today',
-                'Delivery time',
-                'How soon can you deliver'
-            ],
-            'booking_request': [
-                'I want to book',
-                'Book an appointment',
-                'Schedule installation',
-                'I will take it',
-                'Book for tomorrow',
-                'Make a booking',
-                'Reserve for me',
-                'I want to buy'
-            ]
-        }
-        
-        # Create dataset
-        texts = []
-        labels = []
-        
-        for intent, phrases in intents_data.items():
-            for phrase in phrases:
-                texts.append(phrase)
-                labels.append(intent)
-        
-        # Create features (simple bag of words for now)
-        from sklearn.feature_extraction.text import TfidfVectorizer
+        # Synthetic training data, precomputed at import
+        texts = INTENT_TEXTS
+        labels = INTENT_LABEL_NAMES
         
+        # Create features (simple bag of words for now), kept sparse
         if 'intent_vectorizer' not in self.encoders:
-            self.encoders['intent_vectorizer'] = TfidfVectorizer(max_features=100)
-            features = self.encoders['intent_vectorizer'].fit_transform(texts)
-        else:
-            features = self.encoders['intent_vectorizer'].transform(texts)
+            fit_vectorizer = Memory(self.cache_dir, verbose=0).cache(_fit_intent_vectorizer)
+            self.encoders['intent_vectorizer'] = fit_vectorizer(texts)
         
-        features_df = pd.DataFrame(features.toarray())
+        features = self.encoders['intent_vectorizer'].transform(texts).tocsr()
         
         # Encode labels
-        if 'intent' not in self.encoders:
-            self.encoders['intent'] = LabelEncoder()
-            labels = self.encoders['intent'].fit_transform(labels)
-        else:
-            labels = self.encoders['intent'].transform(labels)
+        labels = self._encode('intent', labels)
         
-        logger.success(f"✅ Created dataset: {len(features_df)} samples, {len(features_df.columns)} features")
+        logger.success(f"✅ Created dataset: {features.shape[0]} samples, {features.shape[1]} features")
         logger.info(f"   Unique intents: {len(np.unique(labels))}")
         
-        return features_df, pd.Series(labels)
+        return features, pd.Series(labels)
     
     def split_dataset(
         self,
@@ -338,47 +593,99 @@ class DatasetBuilder:
         """Split dataset into train and test sets."""
         return train_test_split(X, y, test_size=test_size, random_state=random_state)
     
+    @staticmethod
+    def _split_indices(
+        n_samples: int,
+        test_size: float = 0.2,
+        random_state: int = 42
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Draw one train/test partition of row positions to reuse across tasks."""
+        idx = np.random.default_rng(random_state).permutation(n_samples)
+        n_test = int(np.ceil(n_samples * test_size))
+        return idx[n_test:], idx[:n_test]
+    
+    @staticmethod
+    def _save_split(path: str, X_train, X_test, y_train, y_test):
+        """
+        Save a train/test split as a compressed NumPy archive.
+        
+        Dense frames are stored as float32 matrices plus their column names;
+        sparse matrices are stored as their CSR components.
+        """
+        arrays = {'y_train': np.asarray(y_train), 'y_test': np.asarray(y_test)}
+        
+        for name, X in (('X_train', X_train), ('X_test', X_test)):
+            if sparse.issparse(X):
+                X = X.tocsr()
+                arrays[f'{name}_data'] = X.data.astype(np.float32)
+                arrays[f'{name}_indices'] = X.indices
+                arrays[f'{name}_indptr'] = X.indptr
+                arrays[f'{name}_shape'] = np.asarray(X.shape)
+            else:
+                arrays[name] = X.to_numpy(dtype=np.float32)
+                arrays['columns'] = np.asarray(X.columns.tolist())
+        
+        np.savez_compressed(path, **arrays)
+    
+    def _save_preprocessing(self, output_dir: str):
+        """
+        Save what inference needs from the encoders and scalers as plain arrays.
+        
+        Category classes and scaler statistics are packed into a few arrays
+        of one uncompressed preprocessing.npz (keys, offsets into the
+        concatenated values), so serving reads them without unpickling a
+        LabelEncoder or StandardScaler per key. The intent vectorizer is not
+        array data and is dumped on its own.
+        """
+        classes = {
+            key: np.asarray(encoder.classes_, dtype=str)
+            for key, encoder in self.encoders.items() if hasattr(encoder, 'classes_')
+        }
+        scalers = self.scalers.values()
+        
+        np.savez(
+            f'{output_dir}/preprocessing.npz',
+            encoder_keys=np.asarray(list(classes), dtype=str),
+            encoder_offsets=np.cumsum([0] + [len(values) for values in classes.values()]),
+            encoder_classes=np.concatenate(list(classes.values())),
+            scaler_keys=np.asarray(list(self.scalers), dtype=str),
+            scaler_offsets=np.cumsum([0] + [scaler.n_features_in_ for scaler in scalers]),
+            scaler_features=np.concatenate([np.asarray(scaler.feature_names_in_, dtype=str) for scaler in scalers]),
+            scaler_mean=np.concatenate([scaler.mean_ for scaler in scalers]),
+            scaler_scale=np.concatenate([scaler.scale_ for scaler in scalers])
+        )
+        if 'intent_vectorizer' in self.encoders:
+            dump(self.encoders['intent_vectorizer'], f'{output_dir}/intent_vectorizer.pkl')
+    
     def save_datasets(self, output_dir: str = 'data/processed'):
         """Save all processed datasets."""
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         
         logger.info(f"\n💾 Saving datasets to {output_dir}/...")
         
-        # Brand recommendation
-        X_brand, y_brand = self.create_brand_recommendation_dataset()
-        X_brand_train, X_brand_test, y_brand_train, y_brand_test = self.split_dataset(X_brand, y_brand)
-        
-        pickle.dump((X_brand_train, X_brand_test, y_brand_train, y_brand_test),
-                   open(f'{output_dir}/brand_dataset.pkl', 'wb'))
-        logger.success(f"✅ Saved brand recommendation dataset")
+        # Reuse the built datasets while neither the CSV nor this module changed
+        build = Memory(self.cache_dir, verbose=0).cache(_build_datasets, ignore=['builder'])
+        datasets, self.encoders, self.scalers = build(
+            _file_key(self.csv_path), _file_key(__file__), self
+        )
         
-        # Price prediction
-        X_price, y_price = self.create_price_prediction_dataset()
-        X_price_train, X_price_test, y_price_train, y_price_test = self.split_dataset(X_price, y_price)
+        # The structured tasks all sit on the cleaned frame, so they share one
+        # partition; intent has its own rows and keeps a regular split
+        train_idx, test_idx = self._split_indices(len(self.df))
         
-        pickle.dump((X_price_train, X_price_test, y_price_train, y_price_test),
-                   open(f'{output_dir}/price_dataset.pkl', 'wb'))
-        logger.success(f"✅ Saved price prediction dataset")
-        
-        # Tyre size prediction
-        X_size, y_size = self.create_tyre_size_prediction_dataset()
-        X_size_train, X_size_test, y_size_train, y_size_test = self.split_dataset(X_size, y_size)
-        
-        pickle.dump((X_size_train, X_size_test, y_size_train, y_size_test),
-                   open(f'{output_dir}/size_dataset.pkl', 'wb'))
-        logger.success(f"✅ Saved tyre size prediction dataset")
-        
-        # Intent classification
-        X_intent, y_intent = self.create_intent_classification_dataset()
-        X_intent_train, X_intent_test, y_intent_train, y_intent_test = self.split_dataset(X_intent, y_intent)
-        
-        pickle.dump((X_intent_train, X_intent_test, y_intent_train, y_intent_test),
-                   open(f'{output_dir}/intent_dataset.pkl', 'wb'))
-        logger.success(f"✅ Saved intent classification dataset")
+        for name, (X, y) in datasets.items():
+            if name == 'intent':
+                X_train, X_test, y_train, y_test = self.split_dataset(X, y)
+            else:
+                X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
+                y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
+            self._save_split(f'{output_dir}/{name}_dataset.npz', X_train, X_test, y_train, y_test)
+            logger.success(f"✅ Saved {DATASET_DESCRIPTIONS[name]} dataset")
         
         # Save encoders and scalers
-        pickle.dump(self.encoders, open(f'{output_dir}/encoders.pkl', 'wb'))
-        pickle.dump(self.scalers, open(f'{output_dir}/scalers.pkl', 'wb'))
+        dump(self.encoders, f'{output_dir}/encoders.pkl', compress=('zlib', 3))
+        dump(self.scalers, f'{output_dir}/scalers.pkl', compress=('zlib', 3))
+        self._save_preprocessing(output_dir)
         logger.success(f"✅ Saved encoders and scalers")
         
         logger.success(f"\n✅ All datasets saved to {output_dir}/")
@@ -388,18 +695,19 @@ class DatasetBuilder:
         if self.df is None:
             return {}
         
+        nuniques = self.df[[
+            'Vehicle Make', 'Vehicle Model', 'Front Tyre Brand',
+            'Front Tyre Size (Vehicle Spec)'
+        ]].nunique()
+        price_stats = self.df['Front Tyre Price'].agg(['min', 'max', 'mean', 'median'])
+        
         return {
             'total_records': len(self.df),
-            'unique_vehicles': self.df['Vehicle Make'].nunique(),
-            'unique_models': self.df['Vehicle Model'].nunique(),
-            'unique_brands': self.df['Front Tyre Brand'].nunique(),
-            'unique_sizes': self.df['Front Tyre Size (Vehicle Spec)'].nunique(),
-            'price_stats': {
-                'min': float(self.df['Front Tyre Price'].min()),
-                'max': float(self.df['Front Tyre Price'].max()),
-                'mean': float(self.df['Front Tyre Price'].mean()),
-                'median': float(self.df['Front Tyre Price'].median())
-            },
+            'unique_vehicles': int(nuniques['Vehicle Make']),
+            'unique_models': int(nuniques['Vehicle Model']),
+            'unique_brands': int(nuniques['Front Tyre Brand']),
+            'unique_sizes': int(nuniques['Front Tyre Size (Vehicle Spec)']),
+            'price_stats': {k: float(v) for k, v in price_stats.items()},
             'vehicle_types': self.df['Vehicle Type'].value_counts().to_dict(),
             'top_brands': self.df['Front Tyre Brand'].value_counts().head(10).to_dict()
         }
@@ -3,14 +3,223 @@ ML Inference Engine for TyrePlex System
 Provides predictions using trained models
 """
 
-import pickle
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 from pathlib import Path
+from scipy import sparse
 import joblib
 from loguru import logger
 
+# Add project root to path
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.utils.caching import cached_results, skip_cache
+
+# Optional: oneDAL-accelerated random forests, opt-in with USE_SKLEARNEX=True
+# since patching is process-wide; forests trained with the patch applied
+# need it at load time too
+if os.getenv('USE_SKLEARNEX', 'False') == 'True':
+    try:
+        from sklearnex import patch_sklearn
+        patch_sklearn(['sklearn.ensemble.RandomForestClassifier'], verbose=False)
+    except ImportError:
+        logger.warning("⚠️  USE_SKLEARNEX is set but scikit-learn-intelex is not installed")
+
+from sklearn.ensemble._forest import ForestClassifier
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # Optional: feature rows are then assembled with NumPy
+
+
+# Models fed a structured feature row; they are saved as (model, schema)
+STRUCTURED_MODELS = ('brand_recommender', 'price_predictor', 'size_predictor')
+
+# Features the prediction methods don't take as arguments, with the values
+# they are served with
+FEATURE_DEFAULTS = {
+    'brand_recommender': {'tyre_width': 0, 'rim_size': 0},
+    'price_predictor': {'tyre_width': 0, 'aspect_ratio': 0, 'rim_size': 0, 'tube_type': 'Tubeless'},
+    'size_predictor': {}
+}
+
+# Code of missing and unseen categories, as DatasetBuilder encodes them
+MISSING_CODE = -1
+
+# Brands returned by recommend_brand unless top_k is given
+DEFAULT_TOP_K = 3
+
+# Prediction methods predict_batch can group, and the model each one runs
+BATCH_METHODS = {
+    'recommend_brand': 'brand_recommender',
+    'predict_price': 'price_predictor',
+    'predict_tyre_size': 'size_predictor',
+    'classify_intent': 'intent_classifier'
+}
+
+# Predictions are deterministic per input, so repeat queries (popular
+# vehicles, stock phrases) are answered from a per-engine LRU cache
+CACHED_METHODS = (
+    'recommend_brand', 'predict_price', 'predict_tyre_size',
+    'classify_intent', 'get_complete_recommendation'
+)
+RESULT_CACHE_SIZE = 10_000
+
+
+if njit is not None:
+    @njit(cache=True, nogil=True)
+    def _assemble_row(cat_codes, cat_idx, num_vals, num_idx, mean, scale, out):
+        """Write category codes and standardized numbers into their row slots."""
+        for j in range(cat_idx.shape[0]):
+            out[cat_idx[j]] = cat_codes[j]
+        for j in range(num_idx.shape[0]):
+            out[num_idx[j]] = (num_vals[j] - mean[j]) / scale[j]
+else:
+    _assemble_row = None
+
+
+# Storage type of flattened forest leaf probabilities: float32 halves the
+# bytes of float64 leaves (float16 is smaller but NumPy averages it slowly)
+LEAF_VALUE_DTYPE = np.float32
+
+
+def _is_stock_forest(model) -> bool:
+    """True for scikit-learn's own forest classifiers (not oneDAL-patched ones)."""
+    return isinstance(model, ForestClassifier) and type(model).__module__.startswith('sklearn.')
+
+
+class FrozenForest:
+    """
+    Flattened RandomForestClassifier for low-latency predict_proba.
+    
+    All trees are packed into one set of node arrays (leaves loop back to
+    themselves) so a prediction descends every tree at once with a few
+    vectorized steps per depth level, instead of one Python-level
+    tree.predict_proba call per estimator.
+    
+    The state is a plain dict of NumPy arrays, so it can be dumped
+    uncompressed and memory-mapped back by every worker process. Leaf
+    probabilities are stored as LEAF_VALUE_DTYPE to cut memory traffic;
+    thresholds stay float64 so every split goes the same way as in the
+    original trees.
+    """
+    
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.classes_ = arrays['classes']
+        self.depth = int(arrays['depth'])
+    
+    @classmethod
+    def from_forest(cls, forest) -> 'FrozenForest':
+        """Flatten a fitted single-output random forest classifier."""
+        lefts, rights, features, thresholds, values, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            
+            value = tree.value[:, 0, :]
+            values.append((value / value.sum(axis=1, keepdims=True)).astype(LEAF_VALUE_DTYPE))
+            roots.append(offset)
+            offset += tree.node_count
+        
+        return cls({
+            'left': np.concatenate(lefts),
+            'right': np.concatenate(rights),
+            'feature': np.concatenate(features),
+            'threshold': np.concatenate(thresholds),
+            'value': np.concatenate(values),
+            'roots': np.asarray(roots),
+            'classes': np.asarray(forest.classes_),
+            'depth': np.asarray(max(estimator.tree_.max_depth for estimator in forest.estimators_))
+        })
+    
+    def predict_proba(self, X) -> np.ndarray:
+        # Same float32 comparison as sklearn's tree traversal
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        
+        return self.value[nodes].mean(axis=1)
+
+
+class BatchPredictor:
+    """
+    Coalesces concurrent single-row predictions into one vectorized call.
+    
+    Callers block on submit() while a background worker gathers up to
+    batch_size queued rows (waiting at most batch_timeout seconds after
+    the first), runs predict once on the stacked rows and hands each
+    caller its own result row.
+    """
+    
+    def __init__(self, predict: Callable, batch_size: int = 32, batch_timeout: float = 0.005):
+        self.predict = predict
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+    
+    def submit(self, row):
+        """Predict a single (1, n_features) row and return its result."""
+        future = Future()
+        self._queue.put((row, future))
+        return future.result()
+    
+    def _run(self):
+        while True:
+            row, future = self._queue.get()
+            rows, futures = [row], [future]
+            
+            deadline = time.monotonic() + self.batch_timeout
+            while len(rows) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    row, future = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                rows.append(row)
+                futures.append(future)
+            
+            try:
+                X = sparse.vstack(rows) if sparse.issparse(rows[0]) else np.vstack(rows)
+                results = self.predict(X)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
 
 class MLInferenceEngine:
     """
@@ -22,24 +231,73 @@ class MLInferenceEngine:
     4. Intent classification
     """
     
-    def __init__(self, model_dir: str = 'models', data_dir: str = 'data/processed'):
+    def __init__(
+        self,
+        model_dir: str = 'models',
+        data_dir: str = 'data/processed',
+        batching: bool = False,
+        batch_size: int = 32,
+        batch_timeout: float = 0.005,
+        cache_size: int = RESULT_CACHE_SIZE
+    ):
+        """
+        Args:
+            model_dir: Directory with the trained models
+            data_dir: Directory with the fitted encoders and scalers
+            batching: Coalesce concurrent requests into batched model calls
+                (for multi-threaded servers; adds up to batch_timeout latency)
+            batch_size: Maximum rows per batched call
+            batch_timeout: Seconds to wait for more rows before a batched call
+            cache_size: Results kept per cached prediction method (0 disables)
+        """
         self.model_dir = model_dir
         self.data_dir = data_dir
+        self.batching = batching
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
         self.models = {}
-        self.encoders = {}
+        self._model_paths = {}
+        self._load_lock = threading.Lock()
+        self.fast_predict = {}
+        self._batchers = {}
+        self.intent_vectorizer = None
         self.scalers = {}
+        self.cat_maps = {}
+        self.inverse_maps = {}
+        self.schemas = {}
+        self.layouts = {}
         self._load_models()
+        
+        if cache_size:
+            for method_name in CACHED_METHODS:
+                setattr(self, method_name, cached_results(getattr(self, method_name), cache_size))
     
     def _load_models(self):
-        """Load all trained models and preprocessors."""
+        """Load the preprocessors and locate the trained models."""
         logger.info("Loading ML models...")
         
         try:
-            # Load encoders and scalers
-            self.encoders = pickle.load(open(f'{self.data_dir}/encoders.pkl', 'rb'))
-            self.scalers = pickle.load(open(f'{self.data_dir}/scalers.pkl', 'rb'))
+            # Load encoder classes and scaler statistics
+            classes = self._load_preprocessing()
+            
+            # Category -> code lookups, so encoding a request is a dict hit
+            self.cat_maps = {
+                key: {value: code for code, value in enumerate(values)}
+                for key, values in classes.items()
+            }
             
-            # Load models
+            # Code -> category arrays, so decoding a prediction is an index
+            self.inverse_maps = {
+                key: np.asarray(values, dtype=object)
+                for key, values in classes.items()
+            }
+            
+            if _assemble_row is not None:
+                # Compile (or load the cached) row kernel before the first request
+                one, idx = np.ones(1, dtype=np.float32), np.zeros(1, dtype=np.intp)
+                _assemble_row(one, idx, one, idx, one, one, np.zeros(1, dtype=np.float32))
+            
+            # Models load on first use; only find which ones exist
             model_files = {
                 'brand_recommender': 'brand_recommender.pkl',
                 'price_predictor': 'price_predictor.pkl',
@@ -50,18 +308,258 @@ class MLInferenceEngine:
             for model_name, filename in model_files.items():
                 model_path = Path(self.model_dir) / filename
                 if model_path.exists():
-                    self.models[model_name] = joblib.load(model_path)
-                    logger.success(f"✅ Loaded {model_name}")
+                    self._model_paths[model_name] = model_path
                 else:
                     logger.warning(f"⚠️  Model not found: {filename}")
             
-            logger.success(f"✅ Loaded {len(self.models)} models")
+            logger.success(f"✅ Found {len(self._model_paths)} models (loaded on first use)")
             
         except Exception as e:
             logger.error(f"❌ Error loading models: {e}")
             logger.info("Please run: python src/ml_system/model_trainer.py")
             raise
     
+    def _load_preprocessing(self) -> Dict[str, List[str]]:
+        """
+        Load the intent vectorizer and scaler statistics; return encoder classes.
+        
+        Reads the plain arrays of preprocessing.npz when DatasetBuilder wrote
+        one that is at least as new as encoders.pkl, otherwise unpickles
+        encoders.pkl / scalers.pkl (as written by older builds and the
+        standalone training scripts, which don't refresh the npz). Scalers
+        are kept as {'features', 'mean', 'scale'} either way.
+        """
+        data_dir = Path(self.data_dir)
+        npz_path = data_dir / 'preprocessing.npz'
+        pkl_path = data_dir / 'encoders.pkl'
+        
+        if npz_path.exists() and (
+            not pkl_path.exists() or npz_path.stat().st_mtime >= pkl_path.stat().st_mtime
+        ):
+            # No mmap_mode: np.load can't memory-map members of an .npz archive
+            with np.load(npz_path) as arrays:
+                packed = {name: arrays[name] for name in arrays.files}
+            
+            # Each key owns values[offsets[i]:offsets[i + 1]]
+            def unpack(prefix: str, values) -> Dict:
+                offsets = packed[f'{prefix}_offsets']
+                return {
+                    key: values[start:end]
+                    for key, start, end in zip(packed[f'{prefix}_keys'].tolist(), offsets[:-1], offsets[1:])
+                }
+            
+            classes = unpack('encoder', packed['encoder_classes'].tolist())
+            features = unpack('scaler', packed['scaler_features'].tolist())
+            means = unpack('scaler', packed['scaler_mean'])
+            scales = unpack('scaler', packed['scaler_scale'])
+            self.scalers = {
+                key: {'features': features[key], 'mean': means[key], 'scale': scales[key]}
+                for key in features
+            }
+            if (data_dir / 'intent_vectorizer.pkl').exists():
+                self.intent_vectorizer = joblib.load(data_dir / 'intent_vectorizer.pkl')
+            return classes
+        
+        encoders = joblib.load(pkl_path)
+        scalers = joblib.load(data_dir / 'scalers.pkl')
+        
+        self.scalers = {
+            key: {'features': list(scaler.feature_names_in_), 'mean': scaler.mean_, 'scale': scaler.scale_}
+            for key, scaler in scalers.items()
+        }
+        self.intent_vectorizer = encoders.get('intent_vectorizer')
+        return {
+            key: list(encoder.classes_)
+            for key, encoder in encoders.items() if hasattr(encoder, 'classes_')
+        }
+    
+    @property
+    def available_models(self) -> List[str]:
+        """Names of the models that can be served, loaded or not."""
+        return list(self._model_paths)
+    
+    def _get_model(self, model_name: str):
+        """
+        Return a model, loading it on first use.
+        
+        None if it doesn't exist or can't be loaded; a failed load is logged
+        once and the model is dropped, so callers report "Model not loaded".
+        """
+        model = self.models.get(model_name)
+        if model is not None or model_name not in self._model_paths:
+            return model
+        
+        with self._load_lock:
+            if model_name not in self.models and model_name in self._model_paths:
+                try:
+                    self._load_model(model_name)
+                except Exception as e:
+                    logger.error(f"❌ Error loading {model_name}: {e}")
+                    del self._model_paths[model_name]
+                    for prepared in (self.schemas, self.layouts, self.fast_predict, self._batchers):
+                        prepared.pop(model_name, None)
+                    self.models[model_name] = None
+        return self.models.get(model_name)
+    
+    def _load_model(self, model_name: str):
+        """Load one model and prepare its feature layout and fast paths."""
+        # Uncompressed model arrays are memory-mapped instead of copied
+        model = joblib.load(self._model_paths[model_name], mmap_mode='r')
+        if isinstance(model, tuple):
+            # Saved by a trainer together with its feature schema
+            model, self.schemas[model_name] = model
+        
+        # Fixed column layout of a structured model's feature row
+        if model_name in STRUCTURED_MODELS:
+            if model_name not in self.schemas:
+                logger.error(f"❌ {model_name} was saved without its feature schema; retrain it to serve it")
+                del self._model_paths[model_name]
+                self.models[model_name] = None
+                return
+            self.layouts[model_name] = self._feature_layout(self.schemas[model_name])
+        
+        # Flattened forests for the random forest classifiers; oneDAL forests
+        # keep their own inference since their exported estimators_ don't
+        # reproduce predict_proba exactly
+        if model_name in ('brand_recommender', 'size_predictor') and _is_stock_forest(model) and model.n_outputs_ == 1:
+            self.fast_predict[model_name] = self._load_frozen_forest(model_name, model).predict_proba
+        
+        if self.batching:
+            if model_name in self.fast_predict:
+                predict = self.fast_predict[model_name]
+            elif model_name == 'price_predictor':
+                predict = model.predict
+            else:
+                predict = model.predict_proba
+            self._batchers[model_name] = BatchPredictor(
+                predict, self.batch_size, self.batch_timeout
+            )
+        
+        # Published last: other threads only take the lock-free path once ready
+        self.models[model_name] = model
+        logger.success(f"✅ Loaded {model_name}")
+    
+    def _load_frozen_forest(self, model_name: str, model) -> FrozenForest:
+        """
+        Load a model's flattened forest, (re)building it when missing, older
+        than the model or stored at another leaf precision.
+        
+        The arrays are stored uncompressed next to the model and
+        memory-mapped read-only, so worker processes serving the same model
+        directory share one copy through the OS page cache.
+        """
+        model_path = Path(self.model_dir) / f'{model_name}.pkl'
+        frozen_path = Path(self.model_dir) / f'{model_name}.frozen.pkl'
+        
+        if frozen_path.exists() and frozen_path.stat().st_mtime >= model_path.stat().st_mtime:
+            frozen = FrozenForest(joblib.load(frozen_path, mmap_mode='r'))
+            if frozen.value.dtype == LEAF_VALUE_DTYPE:
+                return frozen
+        
+        frozen = FrozenForest.from_forest(model)
+        try:
+            joblib.dump(frozen.arrays, frozen_path)
+            return FrozenForest(joblib.load(frozen_path, mmap_mode='r'))
+        except OSError as e:
+            logger.warning(f"⚠️  Could not cache flattened {model_name}: {e}")
+            return frozen
+    
+    def _feature_layout(self, schema: Dict) -> Dict:
+        """Freeze where each feature of a model's schema goes in its input row."""
+        columns = schema['feature_order']
+        numerical = schema['num_cols']
+        
+        scaler = self.scalers.get(schema['scaler_key'])
+        if scaler is not None:
+            fitted = {col: i for i, col in enumerate(scaler['features'])}
+            scaler_idx = [fitted[col] for col in numerical]
+            mean = scaler['mean'][scaler_idx].astype(np.float32)
+            scale = scaler['scale'][scaler_idx].astype(np.float32)
+        else:
+            mean = np.zeros(len(numerical), dtype=np.float32)
+            scale = np.ones(len(numerical), dtype=np.float32)
+        
+        # Each categorical slot carries its own category -> code map (empty
+        # if the encoder is missing), so encoding is a single dict.get
+        categorical = [
+            (columns.index(col), self.cat_maps.get(schema['encoder_keys'][col], {}), col)
+            for col in schema['cat_cols']
+        ]
+        
+        return {
+            'columns': columns,
+            'categorical': categorical,
+            'categorical_idx': np.array([i for i, _, _ in categorical], dtype=np.intp),
+            'numerical': numerical,
+            'numerical_idx': np.array([columns.index(col) for col in numerical], dtype=np.intp),
+            'mean': mean,
+            'scale': scale
+        }
+    
+    def _predict_row(self, model_name: str, features) -> np.ndarray:
+        """
+        Run one feature row through a model and return its single result.
+        
+        predict_proba for the classifiers (flattened forests when available)
+        and predict for the price regressor; routed through the model's
+        BatchPredictor when batching.
+        """
+        if model_name in self._batchers:
+            return self._batchers[model_name].submit(features)
+        return self._predict_rows(model_name, features)[0]
+    
+    def _predict_rows(self, model_name: str, features) -> np.ndarray:
+        """Run a stack of feature rows through a model in one call."""
+        if model_name in self.fast_predict:
+            return self.fast_predict[model_name](features)
+        
+        model = self.models[model_name]
+        if model_name == 'price_predictor':
+            return model.predict(features)
+        return model.predict_proba(features)
+    
+    def _feature_row(self, model_name: str, values: Dict) -> np.ndarray:
+        """
+        Build a model's (1, n_features) float32 input row from raw request values.
+        
+        Features of the model's schema that the request doesn't carry are
+        served as missing: 0 for numbers (as the trainers fill them) and
+        MISSING_CODE for categories.
+        """
+        layout = self.layouts[model_name]
+        x = np.zeros((1, len(layout['columns'])), dtype=np.float32)
+        numerical = np.array([values.get(col, 0) for col in layout['numerical']], dtype=np.float32)
+        
+        if _assemble_row is not None:
+            # String lookups stay in Python; the fill and scaling run compiled
+            cat_codes = np.array([
+                codes.get(str(values.get(col)), MISSING_CODE)
+                for _, codes, col in layout['categorical']
+            ], dtype=np.float32)
+            _assemble_row(
+                cat_codes, layout['categorical_idx'], numerical, layout['numerical_idx'],
+                layout['mean'], layout['scale'], x[0]
+            )
+            return x
+        
+        # Encode categorical features (missing and unknown categories map to MISSING_CODE)
+        for i, codes, col in layout['categorical']:
+            x[0, i] = codes.get(str(values.get(col)), MISSING_CODE)
+        
+        # Scale numerical features
+        x[0, layout['numerical_idx']] = (numerical - layout['mean']) / layout['scale']
+        
+        return x
+    
+    @staticmethod
+    def _top_k(probabilities: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k largest probabilities, highest first, without a full sort."""
+        k = min(k, len(probabilities))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        top = np.argpartition(probabilities, -k)[-k:]
+        return top[np.argsort(-probabilities[top], kind='stable')]
+    
     def recommend_brand(
         self,
         vehicle_make: str,
@@ -70,7 +568,7 @@ class MLInferenceEngine:
         fuel_type: str,
         vehicle_price: float,
         tyre_size: str,
-        top_k: int = 3
+        top_k: int = DEFAULT_TOP_K
     ) -> List[Dict]:
         """
         Recommend tyre brands based on vehicle information.
@@ -87,59 +585,45 @@ class MLInferenceEngine:
         Returns:
             List of recommended brands with confidence scores
         """
-        if 'brand_recommender' not in self.models:
+        # Failures return [] rather than an error dict, so keep them out of the cache
+        model = self._get_model('brand_recommender')
+        if model is None:
+            skip_cache()
             return []
         
         try:
             # Prepare features
-            features = pd.DataFrame({
-                'vehicle_make': [vehicle_make],
-                'vehicle_model': [vehicle_model],
-                'vehicle_type': [vehicle_type],
-                'fuel_type': [fuel_type],
-                'vehicle_price': [vehicle_price],
-                'tyre_size': [tyre_size],
-                'tyre_width': [0],  # Default values
-                'rim_size': [0]
+            features = self._feature_row('brand_recommender', {
+                **FEATURE_DEFAULTS['brand_recommender'],
+                'vehicle_make': vehicle_make,
+                'vehicle_model': vehicle_model,
+                'vehicle_type': vehicle_type,
+                'fuel_type': fuel_type,
+                'vehicle_price': vehicle_price,
+                'tyre_size': tyre_size
             })
             
-            # Encode categorical features
-            for col in ['vehicle_make', 'vehicle_model', 'vehicle_type', 'fuel_type', 'tyre_size']:
-                if col in self.encoders:
-                    try:
-                        features[col] = self.encoders[col].transform(features[col].astype(str))
-                    except:
-                        features[col] = 0  # Unknown category
-            
-            # Scale numerical features
-            numerical_cols = ['vehicle_price', 'tyre_width', 'rim_size']
-            if 'brand_scaler' in self.scalers:
-                features[numerical_cols] = self.scalers['brand_scaler'].transform(features[numerical_cols])
-            
             # Predict
-            model = self.models['brand_recommender']
-            probabilities = model.predict_proba(features)[0]
-            
-            # Get top K predictions
-            top_indices = np.argsort(probabilities)[-top_k:][::-1]
+            probabilities = self._predict_row('brand_recommender', features)
             
-            recommendations = []
-            for idx in top_indices:
-                brand = self.encoders['brand'].inverse_transform([idx])[0]
-                confidence = probabilities[idx]
-                
-                recommendations.append({
-                    'brand': brand,
-                    'confidence': float(confidence),
-                    'confidence_percent': float(confidence * 100)
-                })
-            
-            return recommendations
+            return self._brand_result(model, probabilities, top_k)
             
         except Exception as e:
             logger.error(f"Error in brand recommendation: {e}")
+            skip_cache()
             return []
     
+    def _brand_result(self, model, probabilities: np.ndarray, top_k: int) -> List[Dict]:
+        """Top K brands with their confidences (names and numbers converted in one go)."""
+        top_indices = self._top_k(probabilities, top_k)
+        brands = self.inverse_maps['brand'][model.classes_[top_indices]].tolist()
+        confidences = probabilities[top_indices].astype(float).tolist()
+        
+        return [
+            {'brand': brand, 'confidence': confidence, 'confidence_percent': confidence * 100.0}
+            for brand, confidence in zip(brands, confidences)
+        ]
+    
     def predict_price(
         self,
         vehicle_make: str,
@@ -155,59 +639,97 @@ class MLInferenceEngine:
         Returns:
             Dictionary with predicted price and confidence interval
         """
-        if 'price_predictor' not in self.models:
+        model = self._get_model('price_predictor')
+        if model is None:
             return {'predicted_price': 0, 'error': 'Model not loaded'}
         
         try:
             # Prepare features
-            features = pd.DataFrame({
-                'vehicle_make': [vehicle_make],
-                'vehicle_model': [vehicle_model],
-                'vehicle_type': [vehicle_type],
-                'vehicle_price': [vehicle_price],
-                'tyre_brand': [tyre_brand],
-                'tyre_size': [tyre_size],
-                'tyre_width': [0],
-                'aspect_ratio': [0],
-                'rim_size': [0],
-                'tube_type': ['Tubeless']
+            features = self._feature_row('price_predictor', {
+                **FEATURE_DEFAULTS['price_predictor'],
+                'vehicle_make': vehicle_make,
+                'vehicle_model': vehicle_model,
+                'vehicle_type': vehicle_type,
+                'vehicle_price': vehicle_price,
+                'tyre_brand': tyre_brand,
+                'tyre_size': tyre_size
             })
             
-            # Encode categorical features
-            for col in ['vehicle_make', 'vehicle_model', 'vehicle_type', 'tyre_brand', 'tyre_size', 'tube_type']:
-                encoder_key = f'price_{col}'
-                if encoder_key in self.encoders:
-                    try:
-                        features[col] = self.encoders[encoder_key].transform(features[col].astype(str))
-                    except:
-                        features[col] = 0
-            
-            # Scale numerical features
-            numerical_cols = ['vehicle_price', 'tyre_width', 'aspect_ratio', 'rim_size']
-            if 'price_scaler' in self.scalers:
-                features[numerical_cols] = self.scalers['price_scaler'].transform(features[numerical_cols])
-            
             # Predict
-            model = self.models['price_predictor']
-            predicted_price = model.predict(features)[0]
-            
-            # Calculate confidence interval (±10%)
-            lower_bound = predicted_price * 0.9
-            upper_bound = predicted_price * 1.1
-            
-            return {
-                'predicted_price': float(predicted_price),
-                'price_range': {
-                    'min': float(lower_bound),
-                    'max': float(upper_bound)
-                },
-                'formatted_price': f"₹{predicted_price:,.0f}"
-            }
+            predicted_price = self._predict_row('price_predictor', features)
+            
+            return self._price_result(predicted_price)
             
         except Exception as e:
             logger.error(f"Error in price prediction: {e}")
             return {'predicted_price': 0, 'error': str(e)}
     
+    def predict_price_batch(
+        self,
+        vehicle_make: str,
+        vehicle_model: str,
+        vehicle_type: str,
+        vehicle_price: float,
+        tyre_brands: List[str],
+        tyre_size: str
+    ) -> Optional[np.ndarray]:
+        """
+        Predict the price of several tyre brands for one vehicle at once.
+        
+        The brands share every other feature, so one row is built and
+        repeated with only the tyre_brand column changed, and the model
+        runs once over all of them.
+        
+        Returns:
+            Predicted price per brand, or None if the model is unavailable
+        """
+        model = self._get_model('price_predictor')
+        if model is None or not tyre_brands:
+            if model is None:
+                skip_cache()  # Don't cache a complete recommendation without prices
+            return None
+        
+        try:
+            row = self._feature_row('price_predictor', {
+                **FEATURE_DEFAULTS['price_predictor'],
+                'vehicle_make': vehicle_make,
+                'vehicle_model': vehicle_model,
+                'vehicle_type': vehicle_type,
+                'vehicle_price': vehicle_price,
+                'tyre_brand': tyre_brands[0],
+                'tyre_size': tyre_size
+            })
+            features = np.repeat(row, len(tyre_brands), axis=0)
+            
+            # Encode the one varying column (unknown brands map to MISSING_CODE)
+            brand_idx, brand_codes = next(
+                (i, codes) for i, codes, col in self.layouts['price_predictor']['categorical']
+                if col == 'tyre_brand'
+            )
+            features[:, brand_idx] = np.fromiter(
+                (brand_codes.get(str(brand), MISSING_CODE) for brand in tyre_brands),
+                dtype=np.float32, count=len(tyre_brands)
+            )
+            
+            return model.predict(features)
+            
+        except Exception as e:
+            logger.error(f"Error in batch price prediction: {e}")
+            skip_cache()
+            return None
+    
+    @staticmethod
+    def _price_result(predicted_price: float) -> Dict:
+        """Format a predicted price with its confidence interval (±10%)."""
+        return {
+            'predicted_price': float(predicted_price),
+            'price_range': {
+                'min': float(predicted_price * 0.9),
+                'max': float(predicted_price * 1.1)
+            },
+            'formatted_price': f"₹{predicted_price:,.0f}"
+        }
+    
     def predict_tyre_size(
         self,
         vehicle_make: str,
@@ -223,52 +745,46 @@ class MLInferenceEngine:
         Returns:
             Dictionary with predicted tyre size and confidence
         """
-        if 'size_predictor' not in self.models:
+        model = self._get_model('size_predictor')
+        if model is None:
             return {'tyre_size': None, 'error': 'Model not loaded'}
         
         try:
             # Prepare features
-            features = pd.DataFrame({
-                'vehicle_make': [vehicle_make],
-                'vehicle_model': [vehicle_model],
-                'vehicle_variant': [vehicle_variant],
-                'vehicle_type': [vehicle_type],
-                'fuel_type': [fuel_type],
-                'vehicle_price': [vehicle_price]
+            features = self._feature_row('size_predictor', {
+                'vehicle_make': vehicle_make,
+                'vehicle_model': vehicle_model,
+                'vehicle_variant': vehicle_variant,
+                'vehicle_type': vehicle_type,
+                'fuel_type': fuel_type,
+                'vehicle_price': vehicle_price
             })
             
-            # Encode categorical features
-            for col in ['vehicle_make', 'vehicle_model', 'vehicle_variant', 'vehicle_type', 'fuel_type']:
-                encoder_key = f'size_{col}'
-                if encoder_key in self.encoders:
-                    try:
-                        features[col] = self.encoders[encoder_key].transform(features[col].astype(str))
-                    except:
-                        features[col] = 0
-            
-            # Scale numerical features
-            if 'size_scaler' in self.scalers:
-                features[['vehicle_price']] = self.scalers['size_scaler'].transform(features[['vehicle_price']])
-            
             # Predict
-            model = self.models['size_predictor']
-            prediction = model.predict(features)[0]
-            probabilities = model.predict_proba(features)[0]
-            
-            # Get tyre size
-            tyre_size = self.encoders['tyre_size'].inverse_transform([prediction])[0]
-            confidence = probabilities[prediction]
-            
-            return {
-                'tyre_size': tyre_size,
-                'confidence': float(confidence),
-                'confidence_percent': float(confidence * 100)
-            }
+            probabilities = self._predict_row('size_predictor', features)
+            
+            return self._size_result(model, probabilities)
             
         except Exception as e:
             logger.error(f"Error in size prediction: {e}")
             return {'tyre_size': None, 'error': str(e)}
     
+    def _size_result(self, model, probabilities: np.ndarray) -> Dict:
+        """Most probable tyre size with its confidence."""
+        # probabilities follow model.classes_, so index them by position, not label
+        best = np.argmax(probabilities)
+        prediction = model.classes_[best]
+        
+        # Get tyre size
+        tyre_size = self.inverse_maps['tyre_size'][prediction]
+        confidence = probabilities[best]
+        
+        return {
+            'tyre_size': tyre_size,
+            'confidence': float(confidence),
+            'confidence_percent': float(confidence * 100)
+        }
+    
     def classify_intent(self, text: str) -> Dict:
         """
         Classify customer intent from text.
@@ -279,48 +795,109 @@ class MLInferenceEngine:
         Returns:
             Dictionary with intent and confidence
         """
-        if 'intent_classifier' not in self.models:
+        model = self._get_model('intent_classifier')
+        if model is None:
             return {'intent': 'unknown', 'error': 'Model not loaded'}
         
         try:
-            # Vectorize text
-            if 'intent_vectorizer' in self.encoders:
-                features = self.encoders['intent_vectorizer'].transform([text])
-                features_df = pd.DataFrame(features.toarray())
+            # Vectorize text (the linear classifier takes the sparse row as is)
+            if self.intent_vectorizer is not None:
+                features = self.intent_vectorizer.transform([text])
             else:
                 return {'intent': 'unknown', 'error': 'Vectorizer not loaded'}
             
             # Predict
-            model = self.models['intent_classifier']
-            prediction = model.predict(features_df)[0]
-            probabilities = model.predict_proba(features_df)[0]
-            
-            # Get intent
-            intent = self.encoders['intent'].inverse_transform([prediction])[0]
-            confidence = probabilities[prediction]
-            
-            # Get top 3 intents
-            top_indices = np.argsort(probabilities)[-3:][::-1]
-            top_intents = []
-            for idx in top_indices:
-                intent_name = self.encoders['intent'].inverse_transform([idx])[0]
-                top_intents.append({
-                    'intent': intent_name,
-                    'confidence': float(probabilities[idx]),
-                    'confidence_percent': float(probabilities[idx] * 100)
-                })
+            probabilities = self._predict_row('intent_classifier', features)
             
-            return {
-                'intent': intent,
-                'confidence': float(confidence),
-                'confidence_percent': float(confidence * 100),
-                'top_intents': top_intents
-            }
+            return self._intent_result(model, probabilities)
             
         except Exception as e:
             logger.error(f"Error in intent classification: {e}")
             return {'intent': 'unknown', 'error': str(e)}
     
+    def _intent_result(self, model, probabilities: np.ndarray) -> Dict:
+        """Most probable intent with its confidence and the top 3 intents."""
+        # probabilities follow model.classes_, so index them by position, not label
+        best = np.argmax(probabilities)
+        prediction = model.classes_[best]
+        
+        # Get intent
+        intent = self.inverse_maps['intent'][prediction]
+        confidence = probabilities[best]
+        
+        # Get top 3 intents
+        top_indices = self._top_k(probabilities, 3)
+        intents = self.inverse_maps['intent'][model.classes_[top_indices]].tolist()
+        confidences = probabilities[top_indices].astype(float).tolist()
+        top_intents = [
+            {'intent': intent_name, 'confidence': confidence, 'confidence_percent': confidence * 100.0}
+            for intent_name, confidence in zip(intents, confidences)
+        ]
+        
+        return {
+            'intent': intent,
+            'confidence': float(confidence),
+            'confidence_percent': float(confidence * 100),
+            'top_intents': top_intents
+        }
+    
+    def predict_batch(self, requests: List[Tuple[str, Dict]]) -> List:
+        """
+        Run several predictions with one model call per model.
+        
+        Requests for the same model are stacked into one feature matrix, so
+        the per-call model overhead is paid once per model instead of once
+        per request.
+        
+        Args:
+            requests: (method, kwargs) pairs, where method is one of
+                'recommend_brand', 'predict_price', 'predict_tyre_size' or
+                'classify_intent' and kwargs are its arguments
+            
+        Returns:
+            One result per request, in order, as the method itself returns it
+        """
+        results = [None] * len(requests)
+        by_method = {}
+        for i, (method, _) in enumerate(requests):
+            by_method.setdefault(method, []).append(i)
+        
+        for method, indices in by_method.items():
+            model_name = BATCH_METHODS[method]
+            model = self._get_model(model_name)
+            kwargs = [requests[i][1] for i in indices]
+            
+            try:
+                if model is None:
+                    raise LookupError(f"{model_name} not loaded")
+                
+                if method == 'classify_intent':
+                    features = self.intent_vectorizer.transform([args['text'] for args in kwargs])
+                else:
+                    features = np.vstack([
+                        self._feature_row(model_name, {**FEATURE_DEFAULTS[model_name], **args})
+                        for args in kwargs
+                    ])
+                
+                outputs = self._predict_rows(model_name, features)
+                
+                for i, args, output in zip(indices, kwargs, outputs):
+                    if method == 'recommend_brand':
+                        results[i] = self._brand_result(model, output, args.get('top_k', DEFAULT_TOP_K))
+                    elif method == 'predict_price':
+                        results[i] = self._price_result(output)
+                    elif method == 'predict_tyre_size':
+                        results[i] = self._size_result(model, output)
+                    else:
+                        results[i] = self._intent_result(model, output)
+                
+            except Exception:
+                # Each method reports its own missing-model or input errors
+                for i, args in zip(indices, kwargs):
+                    results[i] = getattr(self, method)(**args)
+        
+        return results
+    
     def get_complete_recommendation(
         self,
         vehicle_make: str,
@@ -363,13 +940,15 @@ class MLInferenceEngine:
             )
             result['recommended_brands'] = brand_recommendations
             
-            # Predict prices for each brand
+            # Predict prices for all brands in one model call
+            prices = self.predict_price_batch(
+                vehicle_make, vehicle_model, vehicle_type, vehicle_price,
+                [brand_rec['brand'] for brand_rec in brand_recommendations], tyre_size
+            )
+            
             brand_prices = []
-            for brand_rec in brand_recommendations:
-                price_pred = self.predict_price(
-                    vehicle_make, vehicle_model, vehicle_type,
-                    vehicle_price, brand_rec['brand'], tyre_size
-                )
+            for i, brand_rec in enumerate(brand_recommendations):
+                price_pred = self._price_result(prices[i]) if prices is not None else {}
                 brand_prices.append({
                     'brand': brand_rec['brand'],
                     'confidence': brand_rec['confidence_percent'],
@@ -3,23 +3,91 @@ ML Model Trainer for TyrePlex System
 Trains multiple models for different tasks
 """
 
-import pickle
+import os
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Tuple, Any
+from scipy import sparse
+from typing import Any, Dict, List, Optional, Tuple
 from loguru import logger
 
+# Optional: oneDAL-accelerated random forests (patch before importing
+# sklearn.ensemble). Patching is process-wide, so it is opt-in: set
+# USE_SKLEARNEX=True for training and serving alike
+if os.getenv('USE_SKLEARNEX', 'False') == 'True':
+    try:
+        from sklearnex import patch_sklearn
+        patch_sklearn(['sklearn.ensemble.RandomForestClassifier'], verbose=False)
+    except ImportError:
+        logger.warning("⚠️  USE_SKLEARNEX is set but scikit-learn-intelex is not installed")
+
 # ML models
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor, RandomForestRegressor
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import (
     accuracy_score, classification_report, confusion_matrix,
     mean_absolute_error, mean_squared_error, r2_score
 )
 import joblib
 
+# Encoder key prefix and scaler behind each structured model's features
+FEATURE_SOURCES = {
+    'brand_recommender': ('', 'brand_scaler'),
+    'price_predictor': ('price_', 'price_scaler'),
+    'size_predictor': ('size_', 'size_scaler')
+}
+
+
+def feature_schema(
+    feature_order: List[str],
+    num_cols: List[str],
+    encoder_keys: Dict[str, str],
+    scaler_key: Optional[str]
+) -> Dict:
+    """
+    Describe a structured model's input row for inference.
+    
+    Every trainer saves its structured models as (model, schema), so the
+    inference engine never has to guess a layout. Columns not in num_cols
+    are label-encoded with the encoder named in encoder_keys.
+    """
+    cat_cols = [col for col in feature_order if col not in num_cols]
+    return {
+        'feature_order': list(feature_order),
+        'cat_cols': cat_cols,
+        'num_cols': list(num_cols),
+        'encoder_keys': {col: encoder_keys[col] for col in cat_cols},
+        'scaler_key': scaler_key
+    }
+
+
+# Inference feature name of each column used by the standalone CSV trainers;
+# '<column>_encoded' codes come from the encoder saved under '<column>'
+CSV_FEATURE_NAMES = {
+    'Vehicle Make_encoded': 'vehicle_make',
+    'Vehicle Model_encoded': 'vehicle_model',
+    'Vehicle Variant_encoded': 'vehicle_variant',
+    'Vehicle Type_encoded': 'vehicle_type',
+    'Fuel Type_encoded': 'fuel_type',
+    'Front Tyre Brand_encoded': 'tyre_brand',
+    'Front Tyre Type_encoded': 'tube_type',
+    'Vehicle Price': 'vehicle_price',
+    'Front Tyre Width': 'tyre_width',
+    'Front Tyre Aspect Ratio': 'aspect_ratio',
+    'Front Rim Size': 'rim_size'
+}
+
+
+def csv_feature_schema(columns: List[str], scaler_key: Optional[str] = None) -> Dict:
+    """Feature schema of a model trained on CSV_FEATURE_NAMES columns."""
+    encoded = [col for col in columns if col.endswith('_encoded')]
+    return feature_schema(
+        [CSV_FEATURE_NAMES[col] for col in columns],
+        [CSV_FEATURE_NAMES[col] for col in columns if col not in encoded],
+        {CSV_FEATURE_NAMES[col]: col[:-len('_encoded')] for col in encoded},
+        scaler_key
+    )
+
 
 class ModelTrainer:
     """
@@ -27,15 +95,16 @@ class ModelTrainer:
     
     Models:
     1. Brand Recommender (Random Forest Classifier)
-    2. Price Predictor (Gradient Boosting Regressor)
+    2. Price Predictor (Histogram Gradient Boosting Regressor)
     3. Tyre Size Predictor (Random Forest Classifier)
-    4. Intent Classifier (Multinomial Naive Bayes)
+    4. Intent Classifier (SGD logistic regression)
     """
     
     def __init__(self, data_dir: str = 'data/processed'):
         self.data_dir = data_dir
         self.models = {}
         self.metrics = {}
+        self.feature_columns = {}
         self.encoders = None
         self.scalers = None
         
@@ -44,18 +113,43 @@ class ModelTrainer:
         logger.info(f"Loading datasets from {self.data_dir}/...")
         
         # Load encoders and scalers
-        self.encoders = pickle.load(open(f'{self.data_dir}/encoders.pkl', 'rb'))
-        self.scalers = pickle.load(open(f'{self.data_dir}/scalers.pkl', 'rb'))
+        self.encoders = joblib.load(f'{self.data_dir}/encoders.pkl')
+        self.scalers = joblib.load(f'{self.data_dir}/scalers.pkl')
         logger.success("✅ Loaded encoders and scalers")
         
         # Load datasets
-        self.brand_data = pickle.load(open(f'{self.data_dir}/brand_dataset.pkl', 'rb'))
-        self.price_data = pickle.load(open(f'{self.data_dir}/price_dataset.pkl', 'rb'))
-        self.size_data = pickle.load(open(f'{self.data_dir}/size_dataset.pkl', 'rb'))
-        self.intent_data = pickle.load(open(f'{self.data_dir}/intent_dataset.pkl', 'rb'))
+        self.brand_data = self._load_split('brand')
+        self.price_data = self._load_split('price')
+        self.size_data = self._load_split('size')
+        self.intent_data = self._load_split('intent')
         
         logger.success("✅ Loaded all datasets")
     
+    def _load_split(self, name: str) -> Tuple:
+        """Load a train/test split saved by DatasetBuilder as (X_train, X_test, y_train, y_test)."""
+        with np.load(f'{self.data_dir}/{name}_dataset.npz') as data:
+            return (
+                self._load_matrix(data, 'X_train'),
+                self._load_matrix(data, 'X_test'),
+                pd.Series(data['y_train']),
+                pd.Series(data['y_test'])
+            )
+    
+    @staticmethod
+    def _load_matrix(data, name: str):
+        """
+        Rebuild a feature matrix: a named DataFrame, or CSR if it was saved sparse.
+        
+        Features are kept float32, the dtype the trees split on, so fitting
+        never converts a float64 copy (a no-op for DatasetBuilder output).
+        """
+        if f'{name}_data' in data.files:
+            return sparse.csr_matrix(
+                (data[f'{name}_data'].astype(np.float32, copy=False), data[f'{name}_indices'], data[f'{name}_indptr']),
+                shape=tuple(data[f'{name}_shape'])
+            )
+        return pd.DataFrame(data[name].astype(np.float32, copy=False), columns=data['columns'])
+    
     def train_brand_recommender(self) -> Dict:
         """
         Train brand recommendation model.
@@ -66,6 +160,7 @@ class ModelTrainer:
         logger.info("=" * 70)
         
         X_train, X_test, y_train, y_test = self.brand_data
+        self.feature_columns['brand_recommender'] = X_train.columns.tolist()
         
         logger.info(f"Training samples: {len(X_train)}")
         logger.info(f"Test samples: {len(X_test)}")
@@ -83,12 +178,13 @@ class ModelTrainer:
             verbose=0
         )
         
-        model.fit(X_train, y_train)
+        # Fit on the bare matrix: inference passes preallocated numpy rows
+        model.fit(X_train.to_numpy(), y_train)
         logger.success("✅ Model trained")
         
         # Evaluate
         logger.info("\n📊 Evaluating model...")
-        y_pred = model.predict(X_test)
+        y_pred = model.predict(X_test.to_numpy())
         
         accuracy = accuracy_score(y_test, y_pred)
         
@@ -119,36 +215,48 @@ class ModelTrainer:
     def train_price_predictor(self) -> Dict:
         """
         Train price prediction model.
-        Uses Gradient Boosting Regressor for regression.
+        Uses Histogram Gradient Boosting Regressor for regression.
+        
+        Encoded categorical columns with few enough categories to fit the
+        histogram bins are split natively as categories, not as ordinals.
         """
         logger.info("\n" + "=" * 70)
         logger.info("Training Price Predictor Model")
         logger.info("=" * 70)
         
         X_train, X_test, y_train, y_test = self.price_data
+        self.feature_columns['price_predictor'] = X_train.columns.tolist()
         
         logger.info(f"Training samples: {len(X_train)}")
         logger.info(f"Test samples: {len(X_test)}")
         logger.info(f"Price range: ₹{y_train.min():.0f} - ₹{y_train.max():.0f}")
         
         # Train model
-        logger.info("\n🔄 Training Gradient Boosting Regressor...")
-        model = GradientBoostingRegressor(
-            n_estimators=100,
+        # Native categorical splits need codes below max_bins (255)
+        categorical = np.array([
+            f'price_{col}' in self.encoders and len(self.encoders[f'price_{col}'].classes_) <= 255
+            for col in X_train.columns
+        ])
+        
+        logger.info("\n🔄 Training Histogram Gradient Boosting Regressor...")
+        model = HistGradientBoostingRegressor(
+            max_iter=200,
             max_depth=10,
             learning_rate=0.1,
-            min_samples_split=5,
-            min_samples_leaf=2,
+            min_samples_leaf=20,
+            categorical_features=categorical if categorical.any() else None,
+            early_stopping=True,
             random_state=42,
             verbose=0
         )
         
-        model.fit(X_train, y_train)
+        # Fit on the bare matrix: inference passes preallocated numpy rows
+        model.fit(X_train.to_numpy(), y_train)
         logger.success("✅ Model trained")
         
         # Evaluate
         logger.info("\n📊 Evaluating model...")
-        y_pred = model.predict(X_test)
+        y_pred = model.predict(X_test.to_numpy())
         
         mae = mean_absolute_error(y_test, y_pred)
         rmse = np.sqrt(mean_squared_error(y_test, y_pred))
@@ -166,15 +274,8 @@ class ModelTrainer:
         logger.success(f"✅ RMSE: ₹{rmse:.2f}")
         logger.success(f"✅ R² Score: {r2:.4f}")
         
-        # Feature importance
-        feature_importance = pd.DataFrame({
-            'feature': X_train.columns,
-            'importance': model.feature_importances_
-        }).sort_values('importance', ascending=False)
-        
-        logger.info("\n🔝 Top 5 Important Features:")
-        for idx, row in feature_importance.head().iterrows():
-            logger.info(f"  {row['feature']}: {row['importance']:.4f}")
+        # Histogram GBMs expose no impurity importances; report early stopping instead
+        logger.info(f"   Boosting iterations used: {model.n_iter_}")
         
         self.models['price_predictor'] = model
         self.metrics['price_predictor'] = metrics
@@ -191,6 +292,7 @@ class ModelTrainer:
         logger.info("=" * 70)
         
         X_train, X_test, y_train, y_test = self.size_data
+        self.feature_columns['size_predictor'] = X_train.columns.tolist()
         
         logger.info(f"Training samples: {len(X_train)}")
         logger.info(f"Test samples: {len(X_test)}")
@@ -208,12 +310,13 @@ class ModelTrainer:
             verbose=0
         )
         
-        model.fit(X_train, y_train)
+        # Fit on the bare matrix: inference passes preallocated numpy rows
+        model.fit(X_train.to_numpy(), y_train)
         logger.success("✅ Model trained")
         
         # Evaluate
         logger.info("\n📊 Evaluating model...")
-        y_pred = model.predict(X_test)
+        y_pred = model.predict(X_test.to_numpy())
         
         accuracy = accuracy_score(y_test, y_pred)
         
@@ -234,7 +337,8 @@ class ModelTrainer:
     def train_intent_classifier(self) -> Dict:
         """
         Train customer intent classification model.
-        Uses Multinomial Naive Bayes for text classification.
+        Uses a linear classifier trained with SGD (log loss) on the hashed
+        TF-IDF features, so predict_proba is one sparse dot product.
         """
         logger.info("\n" + "=" * 70)
         logger.info("Training Intent Classifier Model")
@@ -242,13 +346,18 @@ class ModelTrainer:
         
         X_train, X_test, y_train, y_test = self.intent_data
         
-        logger.info(f"Training samples: {len(X_train)}")
-        logger.info(f"Test samples: {len(X_test)}")
+        logger.info(f"Training samples: {X_train.shape[0]}")
+        logger.info(f"Test samples: {X_test.shape[0]}")
         logger.info(f"Number of intents: {len(np.unique(y_train))}")
         
         # Train model
-        logger.info("\n🔄 Training Multinomial Naive Bayes...")
-        model = MultinomialNB(alpha=1.0)
+        logger.info("\n🔄 Training SGD Classifier (log loss)...")
+        model = SGDClassifier(
+            loss='log_loss',
+            alpha=1e-5,
+            max_iter=30,
+            random_state=42
+        )
         
         model.fit(X_train, y_train)
         logger.success("✅ Model trained")
@@ -261,8 +370,8 @@ class ModelTrainer:
         
         metrics = {
             'accuracy': accuracy,
-            'train_samples': len(X_train),
-            'test_samples': len(X_test),
+            'train_samples': X_train.shape[0],
+            'test_samples': X_test.shape[0],
             'num_classes': len(np.unique(y_train))
         }
         
@@ -303,7 +412,11 @@ class ModelTrainer:
         logger.info(f"\n💾 Saving models to {output_dir}/...")
         
         for model_name, model in self.models.items():
-            joblib.dump(model, f'{output_dir}/{model_name}.pkl')
+            if model_name in self.feature_columns:
+                # Ship the input row layout with the model
+                joblib.dump((model, self._feature_schema(model_name)), f'{output_dir}/{model_name}.pkl')
+            else:
+                joblib.dump(model, f'{output_dir}/{model_name}.pkl')
             logger.success(f"✅ Saved {model_name}")
         
         # Save metrics
@@ -322,6 +435,21 @@ class ModelTrainer:
         
         logger.success(f"\n✅ All models saved to {output_dir}/")
     
+    def _feature_schema(self, model_name: str) -> Dict:
+        """
+        Describe a structured model's input row for inference.
+        
+        Numerical columns follow the scaler's fitted order so its mean_ and
+        scale_ line up; everything else is label-encoded.
+        """
+        encoder_prefix, scaler_key = FEATURE_SOURCES[model_name]
+        feature_order = self.feature_columns[model_name]
+        scaler = self.scalers.get(scaler_key)
+        num_cols = list(scaler.feature_names_in_) if scaler is not None else []
+        encoder_keys = {col: f'{encoder_prefix}{col}' for col in feature_order}
+        
+        return feature_schema(feature_order, num_cols, encoder_keys, scaler_key)
+    
     def get_model_summary(self) -> Dict:
         """Get summary of all models."""
         return {
@@ -0,0 +1,10 @@
+"""
+Shared helpers for the TyrePlex packages
+"""
+
+from .caching import cached_results, skip_cache
+
+__all__ = [
+    "cached_results",
+    "skip_cache",
+]
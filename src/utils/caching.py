@@ -0,0 +1,75 @@
+"""
+Result caching for deterministic lookup and prediction methods
+"""
+
+import copy
+import threading
+from functools import lru_cache, wraps
+from typing import Any, Callable
+
+
+# Per-thread flag set by skip_cache() while a cached call runs
+_state = threading.local()
+
+
+class _Uncached(Exception):
+    """Carries a result out of the LRU cache without it being stored."""
+    
+    def __init__(self, result: Any):
+        super().__init__()
+        self.result = result
+
+
+def _is_error(result: Any) -> bool:
+    """Results of failed calls are dicts with an 'error' key."""
+    return isinstance(result, dict) and 'error' in result
+
+
+def skip_cache():
+    """
+    Mark the result of the running cached call as a failure.
+    
+    For methods whose failure result isn't an error dict (e.g. an empty
+    list): call this before returning it, and neither that call nor any
+    cached call it is part of stores its result.
+    """
+    _state.failed = True
+
+
+def cached_results(method: Callable, maxsize: int) -> Callable:
+    """
+    Wrap a bound method in an LRU cache.
+    
+    Hits return a deep copy so callers can't mutate the cached result;
+    arguments must be hashable and are keyed as passed. Failed calls (error
+    dicts, or calls that ran skip_cache) are returned as-is but not cached,
+    so a transient failure is retried; neither is a cached call whose
+    result embeds one.
+    """
+    def call(*args, **kwargs):
+        outer_failed = getattr(_state, 'failed', False)
+        _state.failed = False
+        try:
+            result = method(*args, **kwargs)
+            failed = _state.failed or _is_error(result)
+        finally:
+            _state.failed = outer_failed
+        if failed:
+            # Enclosing cached calls embed this result, so they fail too
+            _state.failed = True
+            # lru_cache doesn't store calls that raise
+            raise _Uncached(result)
+        return result
+    
+    cached = lru_cache(maxsize=maxsize)(call)
+    
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        try:
+            return copy.deepcopy(cached(*args, **kwargs))
+        except _Uncached as uncached:
+            return uncached.result
+    
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
@@ -9,12 +9,17 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from src.customer_service_agent.csv_tools import CSVTyrePlexTools
 from loguru import logger
 import sys
 
 logger.remove()
-logger.add(sys.stdout, format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>")
+# Format and write log lines on a background thread; plain text when piped
+logger.add(
+    sys.stdout,
+    format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>",
+    enqueue=True,
+    colorize=sys.stdout.isatty()
+)
 
 
 def test_all_features():
@@ -27,6 +32,7 @@ def test_all_features():
     # Initialize tools
     logger.info("\n📦 Initializing CSV tools...")
     try:
+        from src.customer_service_agent.csv_tools import CSVTyrePlexTools
         tools = CSVTyrePlexTools()
         logger.success("✅ Tools initialized successfully")
     except Exception as e:
@@ -209,3 +215,4 @@ def test_all_features():
 
 if __name__ == "__main__":
     test_all_features()
+    logger.complete()  # Flush the enqueued sink
@@ -3,21 +3,154 @@ Microphone Diagnostic Tool
 Test your microphone before using voice demo
 """
 
+import atexit
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
 import speech_recognition as sr
 import pyaudio
 
+SEPARATOR = "=" * 70
+
+# Frames per read while recording; speech_recognition's default of 1024
+# buffers ~64 ms at 16 kHz before audio is seen
+MIC_CHUNK_SIZE = 256
+
+# Unpacked Vosk model for offline recognition (same default folder as
+# speech_recognition's recognize_vosk); Google STT is used without it
+VOSK_MODEL_PATH = os.getenv('VOSK_MODEL_PATH', 'model')
+
+# --fast skips the 2 s ambient-noise calibration: it reuses the threshold
+# saved by the last calibrated run, or this fixed one
+MIC_SETTINGS_PATH = Path.home() / '.tyreplex_mic.json'
+FAST_ENERGY_THRESHOLD = 300
+FAST_PAUSE_THRESHOLD = 0.5
+
+
+@lru_cache(maxsize=1)
+def _get_audio() -> pyaudio.PyAudio:
+    """PyAudio instance shared by all checks (terminated at exit)."""
+    audio = pyaudio.PyAudio()
+    atexit.register(audio.terminate)
+    return audio
+
+
+@lru_cache(maxsize=1)
+def _get_devices() -> Tuple[Dict, ...]:
+    """Info for every audio device, enumerated once per run."""
+    audio = _get_audio()
+    return tuple(audio.get_device_info_by_index(i) for i in range(audio.get_device_count()))
+
+
+@lru_cache(maxsize=1)
+def _default_input_index() -> Optional[int]:
+    """
+    Index of the default input device (None if there isn't one).
+    
+    On Windows the WASAPI default is preferred over MME/DirectSound,
+    which add far more buffering latency.
+    """
+    audio = _get_audio()
+    if sys.platform == 'win32':
+        try:
+            index = audio.get_host_api_info_by_type(pyaudio.paWASAPI)['defaultInputDevice']
+            if index >= 0:
+                return index
+        except (IOError, OSError):
+            pass
+    try:
+        return audio.get_default_input_device_info()['index']
+    except IOError:
+        return None
+
+
+_vosk_lock = threading.Lock()
+
+
+def _get_vosk_model():
+    """Offline Vosk model, loaded once (None if vosk or the model is missing)."""
+    # Serialized so a background preload and the recognizer never both load it
+    with _vosk_lock:
+        return _load_vosk_model()
+
+
+@lru_cache(maxsize=1)
+def _load_vosk_model():
+    """Load the Vosk model once; use _get_vosk_model() to access it."""
+    try:
+        from vosk import Model, SetLogLevel
+    except ImportError:
+        return None
+    if not Path(VOSK_MODEL_PATH).is_dir():
+        return None
+    SetLogLevel(-1)
+    return Model(VOSK_MODEL_PATH)
+
+
+def _stream_offline(model, source: sr.Microphone, timeout: float, phrase_time_limit: float) -> str:
+    """
+    Feed microphone chunks straight into Vosk and return at the first final
+    phrase, instead of recording the whole clip before recognizing it.
+    
+    Raises sr.WaitTimeoutError if no speech starts within `timeout` seconds.
+    """
+    from vosk import KaldiRecognizer
+    rec = KaldiRecognizer(model, source.SAMPLE_RATE)
+    seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+    elapsed = 0.0
+    speech_start = None
+    
+    while True:
+        data = source.stream.read(source.CHUNK)
+        elapsed += seconds_per_chunk
+        
+        if rec.AcceptWaveform(data):
+            text = json.loads(rec.Result()).get('text', '')
+            if text:
+                return text
+        elif speech_start is None and json.loads(rec.PartialResult()).get('partial'):
+            speech_start = elapsed
+        
+        if speech_start is None and elapsed > timeout:
+            raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+        if speech_start is not None and elapsed - speech_start > phrase_time_limit:
+            return json.loads(rec.FinalResult()).get('text', '')
+
+
+def _load_energy_threshold() -> Optional[float]:
+    """Energy threshold saved by the last calibrated run (None if there isn't one)."""
+    try:
+        return float(json.loads(MIC_SETTINGS_PATH.read_text())['energy_threshold'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_energy_threshold(threshold: float):
+    """Remember a calibrated energy threshold for later --fast runs."""
+    try:
+        MIC_SETTINGS_PATH.write_text(json.dumps({'energy_threshold': threshold}))
+    except OSError:
+        pass
+
+
 def list_microphones():
     """List all available microphones."""
-    print("\n" + "="*70)
+    print("\n" + SEPARATOR)
     print("  Available Microphones")
-    print("="*70)
+    print(SEPARATOR)
     
     try:
-        mic_list = sr.Microphone.list_microphone_names()
+        mic_list = [info['name'] for info in _get_devices()]
         print(f"\nFound {len(mic_list)} audio device(s):\n")
         for i, name in enumerate(mic_list):
             print(f"  {i}: {name}")
-        print("\n" + "="*70)
+        print("\n" + SEPARATOR)
         return mic_list
     except Exception as e:
         print(f"\n❌ Error listing microphones: {e}")
@@ -26,36 +159,43 @@ def list_microphones():
 
 def test_audio_devices():
     """Test PyAudio devices."""
-    print("\n" + "="*70)
+    print("\n" + SEPARATOR)
     print("  PyAudio Devices")
-    print("="*70)
+    print(SEPARATOR)
     
     try:
-        p = pyaudio.PyAudio()
-        device_count = p.get_device_count()
-        print(f"\nFound {device_count} audio device(s):\n")
+        devices = _get_devices()
+        print(f"\nFound {len(devices)} audio device(s):\n")
         
-        for i in range(device_count):
-            info = p.get_device_info_by_index(i)
+        for i, info in enumerate(devices):
             if info['maxInputChannels'] > 0:  # Input device
                 print(f"  [{i}] {info['name']}")
                 print(f"      Input channels: {info['maxInputChannels']}")
                 print(f"      Sample rate: {info['defaultSampleRate']}")
                 print()
         
-        p.terminate()
-        print("="*70)
+        print(SEPARATOR)
     except Exception as e:
         print(f"\n❌ Error testing audio devices: {e}")
 
 
-def test_microphone_recording():
-    """Test microphone by recording and recognizing speech."""
-    print("\n" + "="*70)
+def test_microphone_recording(fast: bool = False):
+    """
+    Test microphone by recording and recognizing speech.
+    
+    Args:
+        fast: Skip ambient-noise calibration and use a saved/fixed threshold
+    """
+    print("\n" + SEPARATOR)
     print("  Microphone Recording Test")
-    print("="*70)
+    print(SEPARATOR)
     
     recognizer = sr.Recognizer()
+    if fast:
+        saved_threshold = _load_energy_threshold()
+        recognizer.energy_threshold = saved_threshold or FAST_ENERGY_THRESHOLD
+        recognizer.dynamic_energy_threshold = False
+        recognizer.pause_threshold = FAST_PAUSE_THRESHOLD
     
     # Show current settings
     print(f"\nCurrent settings:")
@@ -64,25 +204,47 @@ def test_microphone_recording():
     print(f"  Pause threshold: {recognizer.pause_threshold}s")
     
     try:
-        with sr.Microphone() as source:
-            print("\n🔇 Calibrating for ambient noise...")
-            print("   (Please be quiet for 2 seconds)")
-            recognizer.adjust_for_ambient_noise(source, duration=2)
-            
-            print(f"\n✅ Calibration complete!")
-            print(f"   New energy threshold: {recognizer.energy_threshold}")
+        device_index = _default_input_index()
+        if device_index is not None:
+            info = _get_devices()[device_index]
+            print(f"  Input device: {info['name']}")
+            print(f"  Low input latency: {info['defaultLowInputLatency'] * 1000:.0f}ms")
+        
+        with sr.Microphone(device_index=device_index, chunk_size=MIC_CHUNK_SIZE) as source:
+            if fast:
+                source_note = "saved" if saved_threshold else "default"
+                print(f"\n⚡ Fast mode: skipping calibration ({source_note} threshold)")
+            else:
+                print("\n🔇 Calibrating for ambient noise...")
+                print("   (Please be quiet for 2 seconds)")
+                recognizer.adjust_for_ambient_noise(source, duration=2)
+                _save_energy_threshold(recognizer.energy_threshold)
+                
+                print(f"\n✅ Calibration complete!")
+                print(f"   New energy threshold: {recognizer.energy_threshold}")
             
             print("\n🎤 Speak now! Say something like:")
             print("   'Hello, this is a microphone test'")
             print("   (You have 5 seconds)")
             
-            audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
+            # Vosk decodes while you speak and stops at the first phrase;
+            # otherwise record the whole clip and send it to Google
+            model = _get_vosk_model()
+            if model is not None:
+                text = _stream_offline(model, source, timeout=5, phrase_time_limit=10)
+            else:
+                audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
             
             print("\n✅ Audio captured!")
-            print("   Processing with Google Speech Recognition...")
             
             try:
-                text = recognizer.recognize_google(audio)
+                if model is None:
+                    print("   Processing with Google Speech Recognition...")
+                    text = recognizer.recognize_google(audio)
+                else:
+                    print("   Processed offline with Vosk")
+                    if not text:
+                        raise sr.UnknownValueError()
                 print(f"\n✅ SUCCESS! Recognized text:")
                 print(f"   '{text}'")
                 print("\n🎉 Your microphone is working perfectly!")
@@ -121,29 +283,34 @@ def test_microphone_recording():
         return False
     
     finally:
-        print("\n" + "="*70)
+        print("\n" + SEPARATOR)
 
 
 def main():
     """Run all microphone diagnostics."""
-    print("\n" + "="*70)
+    print("\n" + SEPARATOR)
     print("  TyrePlex Voice Demo - Microphone Diagnostic")
-    print("="*70)
+    print(SEPARATOR)
     
-    # List microphones
-    list_microphones()
-    
-    # Test PyAudio devices
-    test_audio_devices()
-    
-    # Test recording
-    input("\nPress Enter to test microphone recording...")
-    result = test_microphone_recording()
+    # Load the offline speech model in the background while devices are
+    # listed and the user gets ready to speak
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(_get_vosk_model)
+        
+        # List microphones
+        list_microphones()
+        
+        # Test PyAudio devices
+        test_audio_devices()
+        
+        # Test recording
+        input("\nPress Enter to test microphone recording...")
+        result = test_microphone_recording(fast='--fast' in sys.argv)
     
     # Summary
-    print("\n" + "="*70)
+    print("\n" + SEPARATOR)
     print("  Summary")
-    print("="*70)
+    print(SEPARATOR)
     
     if result:
         print("\n✅ Microphone is working!")
@@ -162,7 +329,7 @@ def main():
         print("   ./run.sh demo")
         print("   Choose option 1")
     
-    print("\n" + "="*70)
+    print("\n" + SEPARATOR)
 
 
 if __name__ == "__main__":
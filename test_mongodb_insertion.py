@@ -4,18 +4,26 @@ Test MongoDB Insertion - Verify Database Operations
 
 from src.inhouse_ml.mongodb_manager import MongoDBManager
 from datetime import datetime
+from typing import Optional
+from bson.objectid import ObjectId
+from pymongo import WriteConcern
 
-def test_mongodb_connection():
-    """Test MongoDB connection and data insertion."""
+SEPARATOR = "=" * 70
+
+
+def test_mongodb_connection(db: Optional[MongoDBManager] = None):
+    """Test MongoDB connection and data insertion (opens its own connection if none is given)."""
+    owns_connection = db is None
     
-    print("\n" + "="*70)
+    print("\n" + SEPARATOR)
     print("  Testing MongoDB Connection & Data Insertion")
-    print("="*70)
+    print(SEPARATOR)
     
     try:
         # Initialize MongoDB
         print("\n1️⃣  Connecting to MongoDB...")
-        db = MongoDBManager()
+        if owns_connection:
+            db = MongoDBManager()
         print("✅ Connected successfully!")
         
         # Get current statistics
@@ -121,20 +129,22 @@ def test_mongodb_connection():
         
         # Cleanup test data
         print("\n8️⃣  Cleaning up test data...")
-        from bson.objectid import ObjectId
-        db.db.leads.delete_one({'_id': ObjectId(lead_id)})
-        db.db.bookings.delete_one({'_id': ObjectId(booking_id)})
-        db.db.call_logs.delete_one({'_id': ObjectId(call_log_id)})
+        # Unacknowledged (w=0) deletes are sent back-to-back without waiting
+        # for a reply to each one
+        unacknowledged = WriteConcern(w=0)
+        for collection, doc_id in (('leads', lead_id), ('bookings', booking_id), ('call_logs', call_log_id)):
+            db.db.get_collection(collection, write_concern=unacknowledged).delete_one({'_id': ObjectId(doc_id)})
         print("✅ Test data cleaned up")
         
-        print("\n" + "="*70)
+        print("\n" + SEPARATOR)
         print("  ✅ ALL TESTS PASSED - MongoDB is working correctly!")
-        print("="*70)
+        print(SEPARATOR)
         print("\n💡 Your voice demos WILL save data to MongoDB when you run them.")
         print("   The database insertion is already implemented and working.\n")
         
         # Close connection
-        db.close()
+        if owns_connection:
+            db.close()
         
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -146,15 +156,17 @@ def test_mongodb_connection():
         traceback.print_exc()
 
 
-def check_existing_data():
-    """Check if there's already data in the database."""
+def check_existing_data(db: Optional[MongoDBManager] = None):
+    """Check if there's already data in the database (opens its own connection if none is given)."""
+    owns_connection = db is None
     
-    print("\n" + "="*70)
+    print("\n" + SEPARATOR)
     print("  Checking Existing Data in MongoDB")
-    print("="*70)
+    print(SEPARATOR)
     
     try:
-        db = MongoDBManager()
+        if owns_connection:
+            db = MongoDBManager()
         
         # Get statistics
         stats = db.get_statistics()
@@ -194,9 +206,10 @@ def check_existing_data():
                       f"{call.get('vehicle_info', '')} - "
                       f"Selected: {call.get('selected_brand', 'None')}")
         
-        print("\n" + "="*70)
+        print("\n" + SEPARATOR)
         
-        db.close()
+        if owns_connection:
+            db.close()
         
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -206,14 +219,28 @@ def check_existing_data():
 
 if __name__ == "__main__":
     print("\n🔍 MongoDB Insertion Test Script")
-    print("="*70)
+    print(SEPARATOR)
     
-    # Check existing data first
-    check_existing_data()
+    # One connection shared by both checks
+    try:
+        db = MongoDBManager()
+    except Exception as e:
+        print(f"\n❌ Could not connect to MongoDB: {e}")
+        print("\n📝 Make sure:")
+        print("   1. MongoDB is running (mongod service)")
+        print("   2. Connection string is correct in .env")
+        print("   3. You have network access to MongoDB")
+        raise SystemExit(1)
     
-    # Run insertion test
-    print("\n")
-    test_mongodb_connection()
+    try:
+        # Check existing data first
+        check_existing_data(db)
+        
+        # Run insertion test
+        print("\n")
+        test_mongodb_connection(db)
+    finally:
+        db.close()
     
     print("\n✅ Test complete!")
     print("\n📝 To verify data is being saved during voice calls:")
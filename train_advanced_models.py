@@ -6,16 +6,116 @@ import pandas as pd
 import numpy as np
 import pickle
 import json
+import sys
+import hashlib
 from pathlib import Path
 from datetime import datetime
-from sklearn.model_selection import train_test_split, GridSearchCV, cross_val_score
+import pyarrow.csv as pac
+import joblib
+from joblib import Memory
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import train_test_split, HalvingGridSearchCV, HalvingRandomSearchCV, cross_val_score
 from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, GradientBoostingClassifier, GradientBoostingRegressor
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, HistGradientBoostingClassifier, HistGradientBoostingRegressor
 from sklearn.linear_model import LogisticRegression, Ridge
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, mean_absolute_error, r2_score
+from src.ml_system.dataset_builder import ARROW_TYPES
+from src.ml_system.model_trainer import CSV_FEATURE_NAMES, csv_feature_schema
 import warnings
 warnings.filterwarnings('ignore')
 
+# Optional: LightGBM replaces the random forest searches for brand and size
+try:
+    import lightgbm as lgb
+except ImportError:
+    lgb = None
+
+# Successive halving: each round keeps the best 1/HALVING_FACTOR of the
+# candidates and gives them HALVING_FACTOR times more training rows
+HALVING_FACTOR = 3
+HALVING_MIN_RESOURCES = 20000
+
+# LightGBM settings; early stopping picks the number of trees up to the cap
+LGBM_PARAMS = {
+    'n_estimators': 500,
+    'learning_rate': 0.05,
+    'num_leaves': 127,
+    'min_child_samples': 20
+}
+LGBM_EARLY_STOPPING_ROUNDS = 50
+
+# Columns used below; the rest of the CSV is skipped while parsing
+USECOLS = [
+    'Vehicle Make', 'Vehicle Model', 'Vehicle Variant', 'Vehicle Type',
+    'Fuel Type', 'Vehicle Price',
+    'Front Tyre Brand', 'Front Tyre Type',
+    'Front Tyre Width', 'Front Tyre Aspect Ratio', 'Front Rim Size',
+    'Front Tyre Price', 'Rear Tyre Price'
+]
+
+
+def halving_min_resources(n_samples):
+    """Rows for the first halving round, scaled down on small datasets."""
+    return min(HALVING_MIN_RESOURCES, n_samples // HALVING_FACTOR ** 2)
+
+
+def encode_categorical(values):
+    """
+    Integer-encode a column with pandas Categorical codes.
+    
+    Returns the codes (missing values become -1) and a LabelEncoder holding
+    the categories, so inference can keep calling transform/inverse_transform.
+    """
+    # Categorical input (Arrow dictionary columns) may carry categories the
+    # cleaned rows no longer use
+    cat = pd.Categorical(values).remove_unused_categories()
+    if not cat.categories.is_monotonic_increasing:
+        # LabelEncoder.transform binary-searches classes_, so keep them sorted
+        cat = cat.reorder_categories(cat.categories.sort_values())
+    encoder = LabelEncoder()
+    encoder.classes_ = np.asarray(cat.categories)
+    return cat.codes.astype(np.int32), encoder
+
+
+def compact_features(X):
+    """Cast encoded codes to int32 and numeric features to float32."""
+    return X.astype({col: np.int32 if col.endswith('_encoded') else np.float32 for col in X.columns})
+
+
+def fit_search(search, X, y):
+    """Fit a hyperparameter search and return it."""
+    return search.fit(X, y)
+
+
+def fit_lightgbm(X, y):
+    """
+    Fit a LightGBM classifier instead of searching a hyperparameter grid.
+    
+    A tenth of the rows is held out for early stopping, and the accuracy on
+    it is returned in place of a CV score, together with the parameters used.
+    """
+    X_fit, X_val, y_fit, y_val = train_test_split(X, y, test_size=0.1, random_state=42)
+    # LightGBM can't score labels it never saw during fitting
+    seen = np.isin(y_val, np.unique(y_fit))
+    X_val, y_val = X_val[seen], y_val[seen]
+    
+    model = lgb.LGBMClassifier(**LGBM_PARAMS, random_state=42, n_jobs=-1, verbose=-1)
+    model.fit(
+        X_fit, y_fit,
+        eval_set=[(X_val, y_val)],
+        callbacks=[lgb.early_stopping(LGBM_EARLY_STOPPING_ROUNDS, verbose=False)]
+    )
+    params = {**LGBM_PARAMS, 'n_estimators': model.best_iteration_ or LGBM_PARAMS['n_estimators']}
+    return model, params, accuracy_score(y_val, model.predict(X_val))
+
+
+# Searches are memoized on their configuration and training data, so re-runs
+# with an unchanged CSV and grids reuse the fitted models
+memory = Memory('data/processed', verbose=0)
+fit_search = memory.cache(fit_search)
+fit_lightgbm = memory.cache(fit_lightgbm)
+
+
 print("\n" + "="*80)
 print("  TyrePlex ML Training - Advanced Mode")
 print("  Training all models with highest accuracy")
@@ -25,42 +125,79 @@ print("="*80)
 Path('models').mkdir(exist_ok=True)
 Path('data/processed').mkdir(parents=True, exist_ok=True)
 
-# Load data
-print("\n[1/7] Loading vehicle data...")
-df = pd.read_csv('vehicle_tyre_mapping.csv', low_memory=False)
-print(f"✅ Loaded {len(df):,} records")
-print(f"✅ Columns: {len(df.columns)}")
-
-# Data cleaning
-print("\n[2/7] Cleaning data...")
-initial_count = len(df)
-
-# Remove rows with missing critical data
-df = df.dropna(subset=[
-    'Vehicle Make', 'Vehicle Model', 'Vehicle Variant',
-    'Front Tyre Brand', 'Front Tyre Price'
-])
-
-# Fill missing prices with median
-df['Front Tyre Price'] = df['Front Tyre Price'].fillna(df['Front Tyre Price'].median())
-df['Rear Tyre Price'] = df['Rear Tyre Price'].fillna(df['Rear Tyre Price'].median())
-
-# Remove invalid prices (0 or negative)
-df = df[df['Front Tyre Price'] > 0]
-
-# Remove duplicates
-df = df.drop_duplicates(subset=['Vehicle Make', 'Vehicle Model', 'Vehicle Variant', 'Front Tyre Brand'])
-
-cleaned_count = len(df)
-print(f"✅ Cleaned: {initial_count:,} → {cleaned_count:,} records ({cleaned_count/initial_count*100:.1f}% retained)")
-
-# Feature engineering
-print("\n[3/7] Engineering features...")
-
-# Create combined features
-df['vehicle_full'] = df['Vehicle Make'] + ' ' + df['Vehicle Model'] + ' ' + df['Vehicle Variant']
-df['tyre_size_front'] = df['Front Tyre Width'].astype(str) + '/' + df['Front Tyre Aspect Ratio'].astype(str) + 'R' + df['Front Rim Size'].astype(str)
-df['price_range'] = pd.cut(df['Front Tyre Price'], bins=[0, 3000, 5000, 8000, 15000, 100000], labels=['budget', 'economy', 'mid', 'premium', 'luxury'])
+# Cleaned + engineered frame, reused until the CSV changes
+csv_path = Path('vehicle_tyre_mapping.csv')
+csv_stat = csv_path.stat()
+cache_key = hashlib.sha1(f"{csv_path}:{csv_stat.st_mtime}:{csv_stat.st_size}".encode()).hexdigest()
+cache_path = Path('data/processed') / f'_advanced_{cache_key}.parquet'
+
+if cache_path.exists():
+    print("\n[1-3/7] Loading cleaned data from cache...")
+    df = pd.read_parquet(cache_path, engine='pyarrow')
+    print(f"✅ Loaded {len(df):,} cleaned records from {cache_path}")
+else:
+    # Load data
+    print("\n[1/7] Loading vehicle data...")
+    # Multithreaded Arrow parse of the used columns only, typed as in
+    # DatasetBuilder (categoricals and float32); optional columns missing
+    # from the CSV are skipped and empty cells read as missing
+    header = pac.open_csv(csv_path).schema.names
+    columns = [col for col in USECOLS if col in header]
+    df = pac.read_csv(
+        csv_path,
+        convert_options=pac.ConvertOptions(
+            include_columns=columns,
+            column_types={col: ARROW_TYPES[col] for col in columns},
+            strings_can_be_null=True
+        )
+    ).to_pandas()
+    print(f"✅ Loaded {len(df):,} records")
+    print(f"✅ Columns: {len(df.columns)}")
+
+    # Data cleaning
+    print("\n[2/7] Cleaning data...")
+    initial_count = len(df)
+
+    # Remove rows with missing critical data
+    df = df.dropna(subset=[
+        'Vehicle Make', 'Vehicle Model', 'Vehicle Variant',
+        'Front Tyre Brand', 'Front Tyre Price'
+    ])
+
+    # Fill missing prices with median
+    df['Front Tyre Price'] = df['Front Tyre Price'].fillna(df['Front Tyre Price'].median())
+    df['Rear Tyre Price'] = df['Rear Tyre Price'].fillna(df['Rear Tyre Price'].median())
+
+    # Remove invalid prices (0 or negative)
+    df = df[df['Front Tyre Price'] > 0]
+
+    # Remove duplicates
+    df = df.drop_duplicates(subset=['Vehicle Make', 'Vehicle Model', 'Vehicle Variant', 'Front Tyre Brand'])
+
+    cleaned_count = len(df)
+    print(f"✅ Cleaned: {initial_count:,} → {cleaned_count:,} records ({cleaned_count/initial_count*100:.1f}% retained)")
+
+    # Feature engineering
+    print("\n[3/7] Engineering features...")
+
+    # Create combined features
+    df['vehicle_full'] = df['Vehicle Make'].str.cat([df['Vehicle Model'], df['Vehicle Variant']], sep=' ')
+
+    # Only a few hundred distinct sizes exist: format each one once and
+    # point every row at it by group number (groups are numbered in order of
+    # first appearance, matching drop_duplicates)
+    size_cols = ['Front Tyre Width', 'Front Tyre Aspect Ratio', 'Front Rim Size']
+    size_codes = df.groupby(size_cols, sort=False, dropna=False).ngroup().to_numpy()
+    # '{:g}' keeps whole sizes as integers ('195/65R15') now they parse as floats
+    unique_sizes = df[size_cols].drop_duplicates()
+    width, aspect, rim = (unique_sizes[col].map('{:g}'.format) for col in size_cols)
+    size_labels = width + '/' + aspect + 'R' + rim
+    df['tyre_size_front'] = pd.Categorical.from_codes(size_codes, categories=size_labels.to_numpy())
+    
+    try:
+        df.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+    except Exception as e:
+        print(f"⚠️  Could not cache cleaned data: {e}")
 
 # Encode categorical variables
 print("\n[4/7] Encoding categorical variables...")
@@ -73,13 +210,8 @@ categorical_cols = [
 
 for col in categorical_cols:
     if col in df.columns:
-        le = LabelEncoder()
-        df[f'{col}_encoded'] = le.fit_transform(df[col].astype(str))
-        encoders[col] = le
+        df[f'{col}_encoded'], encoders[col] = encode_categorical(df[col])
 
-# Save encoders
-with open('data/processed/encoders.pkl', 'wb') as f:
-    pickle.dump(encoders, f)
 print(f"✅ Encoded {len(encoders)} categorical columns")
 
 # Prepare datasets
@@ -93,7 +225,7 @@ brand_features = [
 ]
 brand_features = [f for f in brand_features if f in df.columns]
 
-X_brand = df[brand_features].fillna(0)
+X_brand = compact_features(df[brand_features].fillna(0))
 y_brand = df['Front Tyre Brand_encoded']
 
 # Dataset 2: Price Prediction
@@ -104,7 +236,7 @@ price_features = [
 ]
 price_features = [f for f in price_features if f in df.columns]
 
-X_price = df[price_features].fillna(0)
+X_price = compact_features(df[price_features].fillna(0))
 y_price = df['Front Tyre Price']
 
 # Dataset 3: Size Prediction
@@ -114,24 +246,27 @@ size_features = [
 ]
 size_features = [f for f in size_features if f in df.columns]
 
-X_size = df[size_features].fillna(0)
+X_size = compact_features(df[size_features].fillna(0))
 y_size = df['tyre_size_front']
 
 # Encode tyre size
-le_size = LabelEncoder()
-y_size_encoded = le_size.fit_transform(y_size.astype(str))
-encoders['tyre_size'] = le_size
+y_size_encoded, encoders['tyre_size'] = encode_categorical(y_size)
 
 # Dataset 4: Intent Classification (synthetic for demo)
+# NOTE: these intent labels are random, not taken from customer queries, so
+# the intent classifier can't beat chance (~20%) and its metrics mean nothing
 intents = ['buy_tyres', 'price_inquiry', 'size_inquiry', 'brand_inquiry', 'booking']
 np.random.seed(42)
 df['intent'] = np.random.choice(intents, size=len(df))
-le_intent = LabelEncoder()
-y_intent = le_intent.fit_transform(df['intent'])
-encoders['intent'] = le_intent
+y_intent, encoders['intent'] = encode_categorical(df['intent'])
 
 # Use simple features for intent
-X_intent = df[['Vehicle Make_encoded', 'Front Tyre Brand_encoded']].fillna(0)
+X_intent = compact_features(df[['Vehicle Make_encoded', 'Front Tyre Brand_encoded']].fillna(0))
+
+# Save encoders; the brand target is also decoded under 'brand' at inference
+encoders['brand'] = encoders['Front Tyre Brand']
+with open('data/processed/encoders.pkl', 'wb') as f:
+    pickle.dump(encoders, f)
 
 print(f"✅ Brand dataset: {X_brand.shape}")
 print(f"✅ Price dataset: {X_price.shape}")
@@ -148,36 +283,48 @@ with open('data/processed/size_dataset.pkl', 'wb') as f:
 with open('data/processed/intent_dataset.pkl', 'wb') as f:
     pickle.dump((X_intent, y_intent), f)
 
-# Scale features for price prediction
+# Scale the numerical price features (fitted under their inference names);
+# encoded columns are served as raw codes, so they stay unscaled
+price_numeric = [col for col in price_features if not col.endswith('_encoded')]
 scaler = StandardScaler()
-X_price_scaled = scaler.fit_transform(X_price)
+X_price_scaled = X_price.copy()
+X_price_scaled[price_numeric] = scaler.fit_transform(X_price[price_numeric].rename(columns=CSV_FEATURE_NAMES))
 
 scalers = {'price': scaler}
 with open('data/processed/scalers.pkl', 'wb') as f:
     pickle.dump(scalers, f)
 
 print("\n[6/7] Training models with hyperparameter tuning...")
-print("⏳ This may take 10-30 minutes for highest accuracy...\n")
+print("⏳ This may take a few minutes for highest accuracy...\n")
 
 metrics = {}
 
-# Model 1: Brand Recommender (Random Forest with tuning)
+# Model 1: Brand Recommender (LightGBM, or Random Forest with tuning)
 print("📊 Training Brand Recommender...")
-X_train, X_test, y_train, y_test = train_test_split(X_brand, y_brand, test_size=0.2, random_state=42)
-
-# Hyperparameter tuning
-param_grid_brand = {
-    'n_estimators': [200, 300],
-    'max_depth': [20, 30, None],
-    'min_samples_split': [2, 5],
-    'min_samples_leaf': [1, 2]
-}
+X_train, X_test, y_train, y_test = train_test_split(X_brand.to_numpy(), y_brand.to_numpy(), test_size=0.2, random_state=42)
+
+if lgb is not None:
+    brand_model, params_brand, score_brand = fit_lightgbm(X_train, y_train)
+else:
+    # Hyperparameter tuning
+    param_grid_brand = {
+        'n_estimators': [200, 300],
+        'max_depth': [20, 30, None],
+        'min_samples_split': [2, 5],
+        'min_samples_leaf': [1, 2]
+    }
+
+    rf_brand = RandomForestClassifier(random_state=42, n_jobs=-1)
+    grid_brand = HalvingRandomSearchCV(
+        rf_brand, param_grid_brand, n_candidates='exhaust', factor=HALVING_FACTOR,
+        resource='n_samples', min_resources=halving_min_resources(len(X_train)),
+        cv=3, scoring='accuracy', random_state=42, n_jobs=-1, verbose=1
+    )
+    grid_brand = fit_search(grid_brand, X_train, y_train)
+
+    brand_model = grid_brand.best_estimator_
+    params_brand, score_brand = grid_brand.best_params_, grid_brand.best_score_
 
-rf_brand = RandomForestClassifier(random_state=42, n_jobs=-1)
-grid_brand = GridSearchCV(rf_brand, param_grid_brand, cv=3, scoring='accuracy', n_jobs=-1, verbose=1)
-grid_brand.fit(X_train, y_train)
-
-brand_model = grid_brand.best_estimator_
 y_pred = brand_model.predict(X_test)
 
 metrics['brand_recommender'] = {
@@ -185,30 +332,36 @@ metrics['brand_recommender'] = {
     'precision': precision_score(y_test, y_pred, average='weighted', zero_division=0),
     'recall': recall_score(y_test, y_pred, average='weighted', zero_division=0),
     'f1_score': f1_score(y_test, y_pred, average='weighted', zero_division=0),
-    'best_params': grid_brand.best_params_,
-    'cv_score': grid_brand.best_score_
+    'best_params': params_brand,
+    'cv_score': score_brand
 }
 
-with open('models/brand_recommender.pkl', 'wb') as f:
-    pickle.dump(brand_model, f)
+# Uncompressed joblib dumps keep the tree arrays as raw buffers, so the
+# inference engine can memory-map them (mmap_mode='r') instead of copying;
+# structured models ship with their feature schema, as ModelTrainer saves them
+joblib.dump((brand_model, csv_feature_schema(brand_features)), 'models/brand_recommender.pkl')
 
 print(f"✅ Brand Recommender: {metrics['brand_recommender']['accuracy']*100:.2f}% accuracy")
-print(f"   Best params: {grid_brand.best_params_}")
+print(f"   Best params: {params_brand}")
 
-# Model 2: Price Predictor (Gradient Boosting with tuning)
+# Model 2: Price Predictor (Histogram Gradient Boosting with tuning)
 print("\n📊 Training Price Predictor...")
-X_train, X_test, y_train, y_test = train_test_split(X_price_scaled, y_price, test_size=0.2, random_state=42)
+X_train, X_test, y_train, y_test = train_test_split(X_price_scaled.to_numpy(), y_price.to_numpy(), test_size=0.2, random_state=42)
 
 param_grid_price = {
-    'n_estimators': [200, 300],
+    'max_iter': [200, 300],
     'learning_rate': [0.05, 0.1],
     'max_depth': [5, 7],
-    'min_samples_split': [2, 5]
+    'max_leaf_nodes': [31, 63]
 }
 
-gb_price = GradientBoostingRegressor(random_state=42)
-grid_price = GridSearchCV(gb_price, param_grid_price, cv=3, scoring='r2', n_jobs=-1, verbose=1)
-grid_price.fit(X_train, y_train)
+gb_price = HistGradientBoostingRegressor(random_state=42, early_stopping=True, validation_fraction=0.1)
+grid_price = HalvingGridSearchCV(
+    gb_price, param_grid_price, factor=HALVING_FACTOR,
+    resource='n_samples', min_resources=halving_min_resources(len(X_train)),
+    cv=3, scoring='r2', n_jobs=-1, verbose=1
+)
+grid_price = fit_search(grid_price, X_train, y_train)
 
 price_model = grid_price.best_estimator_
 y_pred = price_model.predict(X_test)
@@ -221,27 +374,35 @@ metrics['price_predictor'] = {
     'cv_score': grid_price.best_score_
 }
 
-with open('models/price_predictor.pkl', 'wb') as f:
-    pickle.dump(price_model, f)
+joblib.dump((price_model, csv_feature_schema(price_features, 'price')), 'models/price_predictor.pkl')
 
 print(f"✅ Price Predictor: R² = {metrics['price_predictor']['r2_score']:.4f}, MAE = ₹{metrics['price_predictor']['mae']:.2f}")
 print(f"   Best params: {grid_price.best_params_}")
 
-# Model 3: Size Predictor (Random Forest with tuning)
+# Model 3: Size Predictor (LightGBM, or Random Forest with tuning)
 print("\n📊 Training Size Predictor...")
-X_train, X_test, y_train, y_test = train_test_split(X_size, y_size_encoded, test_size=0.2, random_state=42)
-
-param_grid_size = {
-    'n_estimators': [200, 300],
-    'max_depth': [15, 20, None],
-    'min_samples_split': [2, 5]
-}
-
-rf_size = RandomForestClassifier(random_state=42, n_jobs=-1)
-grid_size = GridSearchCV(rf_size, param_grid_size, cv=3, scoring='accuracy', n_jobs=-1, verbose=1)
-grid_size.fit(X_train, y_train)
+X_train, X_test, y_train, y_test = train_test_split(X_size.to_numpy(), y_size_encoded, test_size=0.2, random_state=42)
+
+if lgb is not None:
+    size_model, params_size, score_size = fit_lightgbm(X_train, y_train)
+else:
+    param_grid_size = {
+        'n_estimators': [200, 300],
+        'max_depth': [15, 20, None],
+        'min_samples_split': [2, 5]
+    }
+
+    rf_size = RandomForestClassifier(random_state=42, n_jobs=-1)
+    grid_size = HalvingRandomSearchCV(
+        rf_size, param_grid_size, n_candidates='exhaust', factor=HALVING_FACTOR,
+        resource='n_samples', min_resources=halving_min_resources(len(X_train)),
+        cv=3, scoring='accuracy', random_state=42, n_jobs=-1, verbose=1
+    )
+    grid_size = fit_search(grid_size, X_train, y_train)
+
+    size_model = grid_size.best_estimator_
+    params_size, score_size = grid_size.best_params_, grid_size.best_score_
 
-size_model = grid_size.best_estimator_
 y_pred = size_model.predict(X_test)
 
 metrics['size_predictor'] = {
@@ -249,47 +410,42 @@ metrics['size_predictor'] = {
     'precision': precision_score(y_test, y_pred, average='weighted', zero_division=0),
     'recall': recall_score(y_test, y_pred, average='weighted', zero_division=0),
     'f1_score': f1_score(y_test, y_pred, average='weighted', zero_division=0),
-    'best_params': grid_size.best_params_,
-    'cv_score': grid_size.best_score_
+    'best_params': params_size,
+    'cv_score': score_size
 }
 
-with open('models/size_predictor.pkl', 'wb') as f:
-    pickle.dump(size_model, f)
+joblib.dump((size_model, csv_feature_schema(size_features)), 'models/size_predictor.pkl')
 
 print(f"✅ Size Predictor: {metrics['size_predictor']['accuracy']*100:.2f}% accuracy")
-print(f"   Best params: {grid_size.best_params_}")
+print(f"   Best params: {params_size}")
 
-# Model 4: Intent Classifier (Gradient Boosting with tuning)
+# Model 4: Intent Classifier (Histogram Gradient Boosting, single fit)
+# Intent labels are synthetic (np.random.choice, see Dataset 4), so accuracy
+# sits at chance whatever the hyperparameters; a grid search would only
+# multiply the fits. The fixed parameters are still reported as best_params,
+# with a plain 3-fold CV score, so model_metrics.json matches the other models
 print("\n📊 Training Intent Classifier...")
 X_train, X_test, y_train, y_test = train_test_split(X_intent, y_intent, test_size=0.2, random_state=42)
 
-param_grid_intent = {
-    'n_estimators': [100, 200],
-    'learning_rate': [0.1, 0.2],
-    'max_depth': [3, 5]
-}
-
-gb_intent = GradientBoostingClassifier(random_state=42)
-grid_intent = GridSearchCV(gb_intent, param_grid_intent, cv=3, scoring='accuracy', n_jobs=-1, verbose=1)
-grid_intent.fit(X_train, y_train)
-
-intent_model = grid_intent.best_estimator_
+params_intent = {'max_iter': 100, 'learning_rate': 0.1, 'max_depth': 3}
+intent_model = HistGradientBoostingClassifier(random_state=42, **params_intent)
+intent_model.fit(X_train, y_train)
 y_pred = intent_model.predict(X_test)
+score_intent = cross_val_score(intent_model, X_train, y_train, cv=3, scoring='accuracy', n_jobs=-1).mean()
 
 metrics['intent_classifier'] = {
     'accuracy': accuracy_score(y_test, y_pred),
     'precision': precision_score(y_test, y_pred, average='weighted', zero_division=0),
     'recall': recall_score(y_test, y_pred, average='weighted', zero_division=0),
     'f1_score': f1_score(y_test, y_pred, average='weighted', zero_division=0),
-    'best_params': grid_intent.best_params_,
-    'cv_score': grid_intent.best_score_
+    'best_params': params_intent,
+    'cv_score': score_intent
 }
 
-with open('models/intent_classifier.pkl', 'wb') as f:
-    pickle.dump(intent_model, f)
+joblib.dump(intent_model, 'models/intent_classifier.pkl')
 
 print(f"✅ Intent Classifier: {metrics['intent_classifier']['accuracy']*100:.2f}% accuracy")
-print(f"   Best params: {grid_intent.best_params_}")
+print(f"   Best params: {params_intent}")
 
 # Save metrics
 print("\n[7/7] Saving metrics and metadata...")
@@ -305,41 +461,45 @@ metrics['features'] = {
 with open('models/model_metrics.json', 'w') as f:
     json.dump(metrics, f, indent=2, default=str)
 
-print("\n" + "="*80)
-print("  Training Complete!")
-print("="*80)
-
-print("\n📊 Final Model Performance:")
-print(f"\n1. Brand Recommender:")
-print(f"   Accuracy:  {metrics['brand_recommender']['accuracy']*100:.2f}%")
-print(f"   Precision: {metrics['brand_recommender']['precision']*100:.2f}%")
-print(f"   Recall:    {metrics['brand_recommender']['recall']*100:.2f}%")
-print(f"   F1-Score:  {metrics['brand_recommender']['f1_score']*100:.2f}%")
-
-print(f"\n2. Price Predictor:")
-print(f"   R² Score:  {metrics['price_predictor']['r2_score']:.4f}")
-print(f"   MAE:       ₹{metrics['price_predictor']['mae']:.2f}")
-print(f"   Avg Price: ₹{metrics['price_predictor']['mean_price']:.2f}")
-
-print(f"\n3. Size Predictor:")
-print(f"   Accuracy:  {metrics['size_predictor']['accuracy']*100:.2f}%")
-print(f"   Precision: {metrics['size_predictor']['precision']*100:.2f}%")
-print(f"   Recall:    {metrics['size_predictor']['recall']*100:.2f}%")
-print(f"   F1-Score:  {metrics['size_predictor']['f1_score']*100:.2f}%")
-
-print(f"\n4. Intent Classifier:")
-print(f"   Accuracy:  {metrics['intent_classifier']['accuracy']*100:.2f}%")
-print(f"   Precision: {metrics['intent_classifier']['precision']*100:.2f}%")
-print(f"   Recall:    {metrics['intent_classifier']['recall']*100:.2f}%")
-print(f"   F1-Score:  {metrics['intent_classifier']['f1_score']*100:.2f}%")
-
-print("\n✅ All models saved to 'models/' directory")
-print("✅ Processed data saved to 'data/processed/' directory")
-print("✅ Metrics saved to 'models/model_metrics.json'")
-
-print("\n💡 Next steps:")
-print("   1. Test models: python test_complete_system.py")
-print("   2. Run voice agent: python voice_demo_aws.py")
-print("   3. Check metrics: cat models/model_metrics.json")
-
-print("\n" + "="*80)
+# Final report, written to stdout in one call
+report = [
+    "\n" + "="*80,
+    "  Training Complete!",
+    "="*80,
+
+    "\n📊 Final Model Performance:",
+    "\n1. Brand Recommender:",
+    f"   Accuracy:  {metrics['brand_recommender']['accuracy']*100:.2f}%",
+    f"   Precision: {metrics['brand_recommender']['precision']*100:.2f}%",
+    f"   Recall:    {metrics['brand_recommender']['recall']*100:.2f}%",
+    f"   F1-Score:  {metrics['brand_recommender']['f1_score']*100:.2f}%",
+
+    "\n2. Price Predictor:",
+    f"   R² Score:  {metrics['price_predictor']['r2_score']:.4f}",
+    f"   MAE:       ₹{metrics['price_predictor']['mae']:.2f}",
+    f"   Avg Price: ₹{metrics['price_predictor']['mean_price']:.2f}",
+
+    "\n3. Size Predictor:",
+    f"   Accuracy:  {metrics['size_predictor']['accuracy']*100:.2f}%",
+    f"   Precision: {metrics['size_predictor']['precision']*100:.2f}%",
+    f"   Recall:    {metrics['size_predictor']['recall']*100:.2f}%",
+    f"   F1-Score:  {metrics['size_predictor']['f1_score']*100:.2f}%",
+
+    "\n4. Intent Classifier:",
+    f"   Accuracy:  {metrics['intent_classifier']['accuracy']*100:.2f}%",
+    f"   Precision: {metrics['intent_classifier']['precision']*100:.2f}%",
+    f"   Recall:    {metrics['intent_classifier']['recall']*100:.2f}%",
+    f"   F1-Score:  {metrics['intent_classifier']['f1_score']*100:.2f}%",
+
+    "\n✅ All models saved to 'models/' directory",
+    "✅ Processed data saved to 'data/processed/' directory",
+    "✅ Metrics saved to 'models/model_metrics.json'",
+
+    "\n💡 Next steps:",
+    "   1. Test models: python test_complete_system.py",
+    "   2. Run voice agent: python voice_demo_aws.py",
+    "   3. Check metrics: cat models/model_metrics.json",
+
+    "\n" + "="*80,
+]
+sys.stdout.write("\n".join(report) + "\n")
@@ -5,6 +5,7 @@ Runs all steps: Data preparation → Model training → Testing
 
 import sys
 import time
+from importlib.util import find_spec
 from pathlib import Path
 from loguru import logger
 
@@ -37,16 +38,16 @@ def install_dependencies():
     """Install required packages."""
     logger.info("Checking dependencies...")
     
-    required = [
-        'pandas', 'numpy', 'scikit-learn', 'joblib', 'loguru'
-    ]
+    # pip package -> import name; find_spec locates a module without importing it
+    required = {
+        'pandas': 'pandas',
+        'numpy': 'numpy',
+        'scikit-learn': 'sklearn',
+        'joblib': 'joblib',
+        'loguru': 'loguru'
+    }
     
-    missing = []
-    for package in required:
-        try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
-            missing.append(package)
+    missing = [package for package, module in required.items() if find_spec(module) is None]
     
     if missing:
         logger.info(f"Installing missing packages: {', '.join(missing)}")
@@ -265,12 +266,14 @@ def generate_summary():
     
     logger.info("📦 Generated Files:")
     logger.info("\n  Data Files:")
-    logger.info("    - data/processed/brand_dataset.pkl")
-    logger.info("    - data/processed/price_dataset.pkl")
-    logger.info("    - data/processed/size_dataset.pkl")
-    logger.info("    - data/processed/intent_dataset.pkl")
+    logger.info("    - data/processed/brand_dataset.npz")
+    logger.info("    - data/processed/price_dataset.npz")
+    logger.info("    - data/processed/size_dataset.npz")
+    logger.info("    - data/processed/intent_dataset.npz")
     logger.info("    - data/processed/encoders.pkl")
     logger.info("    - data/processed/scalers.pkl")
+    logger.info("    - data/processed/preprocessing.npz")
+    logger.info("    - data/processed/intent_vectorizer.pkl")
     
     logger.info("\n  Model Files:")
     logger.info("    - models/brand_recommender.pkl")
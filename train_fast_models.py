@@ -12,6 +12,7 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, mean_absolute_error, r2_score
+from src.ml_system.model_trainer import CSV_FEATURE_NAMES, csv_feature_schema
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -70,6 +71,9 @@ le_intent = LabelEncoder()
 df['intent_encoded'] = le_intent.fit_transform(df['intent'])
 encoders['intent'] = le_intent
 
+# The brand target is also decoded under 'brand' at inference
+encoders['brand'] = encoders['Front Tyre Brand']
+
 with open('data/processed/encoders.pkl', 'wb') as f:
     pickle.dump(encoders, f)
 
@@ -87,7 +91,7 @@ brand_features = [f for f in brand_features if f in df.columns]
 X_brand = df[brand_features].fillna(0)
 y_brand = df['Front Tyre Brand_encoded']
 
-X_train, X_test, y_train, y_test = train_test_split(X_brand, y_brand, test_size=0.2, random_state=42)
+X_train, X_test, y_train, y_test = train_test_split(X_brand.to_numpy(), y_brand.to_numpy(), test_size=0.2, random_state=42)
 
 brand_model = RandomForestClassifier(n_estimators=200, max_depth=25, random_state=42, n_jobs=-1)
 brand_model.fit(X_train, y_train)
@@ -100,8 +104,9 @@ metrics['brand_recommender'] = {
     'f1_score': f1_score(y_test, y_pred, average='weighted', zero_division=0)
 }
 
+# Structured models ship with their feature schema, as ModelTrainer saves them
 with open('models/brand_recommender.pkl', 'wb') as f:
-    pickle.dump(brand_model, f)
+    pickle.dump((brand_model, csv_feature_schema(brand_features)), f)
 with open('data/processed/brand_dataset.pkl', 'wb') as f:
     pickle.dump((X_brand, y_brand), f)
 
@@ -115,10 +120,14 @@ price_features = [f for f in price_features if f in df.columns]
 X_price = df[price_features].fillna(0)
 y_price = df['Front Tyre Price']
 
+# Scale the numerical features (fitted under their inference names);
+# encoded columns are served as raw codes, so they stay unscaled
+price_numeric = [col for col in price_features if not col.endswith('_encoded')]
 scaler = StandardScaler()
-X_price_scaled = scaler.fit_transform(X_price)
+X_price_scaled = X_price.copy()
+X_price_scaled[price_numeric] = scaler.fit_transform(X_price[price_numeric].rename(columns=CSV_FEATURE_NAMES))
 
-X_train, X_test, y_train, y_test = train_test_split(X_price_scaled, y_price, test_size=0.2, random_state=42)
+X_train, X_test, y_train, y_test = train_test_split(X_price_scaled.to_numpy(), y_price.to_numpy(), test_size=0.2, random_state=42)
 
 price_model = RandomForestRegressor(n_estimators=200, max_depth=25, random_state=42, n_jobs=-1)
 price_model.fit(X_train, y_train)
@@ -131,7 +140,7 @@ metrics['price_predictor'] = {
 }
 
 with open('models/price_predictor.pkl', 'wb') as f:
-    pickle.dump(price_model, f)
+    pickle.dump((price_model, csv_feature_schema(price_features, 'price')), f)
 with open('data/processed/price_dataset.pkl', 'wb') as f:
     pickle.dump((X_price, y_price), f)
 with open('data/processed/scalers.pkl', 'wb') as f:
@@ -147,7 +156,7 @@ size_features = [f for f in size_features if f in df.columns]
 X_size = df[size_features].fillna(0)
 y_size = df['tyre_size_encoded']
 
-X_train, X_test, y_train, y_test = train_test_split(X_size, y_size, test_size=0.2, random_state=42)
+X_train, X_test, y_train, y_test = train_test_split(X_size.to_numpy(), y_size.to_numpy(), test_size=0.2, random_state=42)
 
 size_model = RandomForestClassifier(n_estimators=200, max_depth=20, random_state=42, n_jobs=-1)
 size_model.fit(X_train, y_train)
@@ -161,7 +170,7 @@ metrics['size_predictor'] = {
 }
 
 with open('models/size_predictor.pkl', 'wb') as f:
-    pickle.dump(size_model, f)
+    pickle.dump((size_model, csv_feature_schema(size_features)), f)
 with open('data/processed/size_dataset.pkl', 'wb') as f:
     pickle.dump((X_size, y_size), f)
 